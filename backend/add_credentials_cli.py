@@ -3,10 +3,10 @@ import argparse
 import sys
 import os
 
-# Add the parent directory to sys.path
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Add the backend directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from backend.storage.database import DatabaseManager
+from storage.database import DatabaseManager
 
 def main():
     parser = argparse.ArgumentParser(description="Add broker credentials to the database.")
@@ -17,8 +17,8 @@ def main():
     args = parser.parse_args()
     
     try:
-        db = DatabaseManager()
-        db.store_credentials(args.broker, args.username, args.password)
+        with DatabaseManager() as db:
+            db.store_credentials(args.broker, args.username, args.password)
         print(f"Successfully stored credentials for {args.broker}")
     except Exception as e:
         print(f"Error storing credentials: {e}")
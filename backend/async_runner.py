@@ -0,0 +1,17 @@
+"""
+Entry-point helper shared by the runner scripts
+"""
+
+import asyncio
+from typing import Awaitable, Callable, TypeVar
+
+T = TypeVar("T")
+
+
+def run(main: Callable[[], Awaitable[T]]) -> T:
+    """Run main() to completion, on uvloop when it is installed and the stdlib loop otherwise"""
+    try:
+        import uvloop
+    except ImportError:
+        return asyncio.run(main())
+    return uvloop.run(main())
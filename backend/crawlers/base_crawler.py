@@ -1,14 +1,17 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 import asyncio
+import gzip
 import json
 import socket
 import contextlib
 import urllib.request
+from urllib.parse import urlsplit
 import logging
-from playwright.async_api import async_playwright, Browser, BrowserContext, Page
-from bs4 import BeautifulSoup
+from playwright.async_api import async_playwright, Browser, BrowserContext, Page, Route
+from bs4 import BeautifulSoup, SoupStrainer
 from datetime import datetime, timedelta
+from pathlib import Path
 
 import sys
 import os
@@ -24,86 +27,106 @@ logging.basicConfig(
 from models.portfolio import Holding, CrawlerResult
 from storage.database import DatabaseManager
 
-class BaseCrawler(ABC):
-    """Base class for all broker crawlers"""
-    
-    def __init__(self, broker_name: str):
-        self.broker_name = broker_name
-        self.headless = False
-        self.db_manager = DatabaseManager()
+# Set to any non-empty value to have crawlers write page dumps when parsing fails
+DEBUG_DUMP_ENV = 'CRAWLER_DEBUG_DUMP'
+
+
+def debug_dump_enabled() -> bool:
+    return bool(os.environ.get(DEBUG_DUMP_ENV))
+
+
+# Analytics/ad hosts none of the scrapers depend on; matched against the request host suffix
+_TRACKER_HOSTS = (
+    'doubleclick.net',
+    'googletagmanager.com',
+    'google-analytics.com',
+    'adobedtm.com',
+    'demdex.net',
+    'omtrdc.net',
+)
+
+
+def _is_tracker_url(url: str) -> bool:
+    host = urlsplit(url).hostname or ''
+    return host.endswith(_TRACKER_HOSTS)
+
+class BrowserPool:
+    """Process-wide automation Chrome shared by every crawler.
+
+    Launching Chrome and attaching over CDP takes seconds, so it is done once by the first
+    crawler to enter and every crawler after that just opens a tab in the same context.
+    Chrome is shut down when the last user releases it; callers that run several crawlers
+    back to back can hold the pool open with ``async with browser_pool:``.
+    """
+
+    MAX_PAGES = 4
+
+    def __init__(self):
+        self.log = logging.getLogger(self.__class__.__name__)
+        self.playwright = None
         self.browser: Optional[Browser] = None
         self.context: Optional[BrowserContext] = None
-        self.page: Optional[Page] = None
-        self.attached_to_remote = False
         self.chrome_process: Optional[asyncio.subprocess.Process] = None
-        self.chrome_remote_debug_url: Optional[str] = None
-        self.created_page = False
-        self.log = logging.getLogger(f"{self.__class__.__name__}[{broker_name}]")
-        
+        self._startup_page: Optional[Page] = None
+        self._users = 0
+        self._lock = asyncio.Lock()
+        self._page_slots = asyncio.Semaphore(self.MAX_PAGES)
+
     async def __aenter__(self):
-        """Async context manager entry"""
-        await self._setup_browser()
+        await self._acquire()
         return self
-        
+
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        """Async context manager exit"""
-        await self._cleanup_browser()
-    
-    async def _setup_browser(self):
-        """Initialize Playwright browser with enhanced stealth measures"""
-        self.playwright = await async_playwright().start()
-        
-        # Attempt to launch a dedicated automation Chrome instance
+        await self._release()
+
+    async def acquire_page(self, headless: bool = False) -> Tuple[Browser, BrowserContext, Page, bool]:
+        """Return (browser, context, page, created_page) for one crawler"""
+        await self._acquire(headless)
+        await self._page_slots.acquire()
         try:
-            cdp_url = await self._ensure_automation_chrome()
-            self.log.info(f"Launching automation Chrome and attaching over CDP at {cdp_url}")
-            await self._connect_over_cdp(cdp_url)
-            return
-        except Exception as exc:
-            raise RuntimeError(f"Failed to launch automation Chrome: {exc}") from exc
-        
-        # Set up request/response logging (disabled for cleaner output)
-        # self.page.on('request', self._log_request)
-        # self.page.on('response', self._log_response)
-    
-    async def _cleanup_browser(self):
-        """Clean up browser resources"""
-        if self.attached_to_remote:
-            if self.chrome_process:
-                if self.browser:
-                    try:
-                        await self.browser.close()
-                    except Exception:
-                        pass
-                self.chrome_process.terminate()
+            if self._startup_page is not None:
+                # Reuse Chrome's initial tab rather than leaving it blank next to ours
+                page, self._startup_page = self._startup_page, None
+                return self.browser, self.context, page, False
+            return self.browser, self.context, await self.context.new_page(), True
+        except Exception:
+            self._page_slots.release()
+            await self._release()
+            raise
+
+    async def release_page(self, page: Page, created_page: bool):
+        try:
+            if created_page:
                 try:
-                    await asyncio.wait_for(self.chrome_process.wait(), timeout=5)
-                except asyncio.TimeoutError:
-                    self.chrome_process.kill()
-                    await self.chrome_process.wait()
-                self.chrome_process = None
+                    await page.close()
+                except Exception:
+                    pass
             else:
-                if self.created_page and self.page:
-                    try:
-                        await self.page.close()
-                    except Exception:
-                        pass
-            if hasattr(self, 'playwright'):
-                await self.playwright.stop()
-            return
-
-        if self.page:
-            await self.page.close()
-        if self.context:
-            await self.context.close()
-        if self.browser:
-            await self.browser.close()
-        if hasattr(self, 'playwright'):
-            await self.playwright.stop()
-
-    async def _connect_over_cdp(self, cdp_url: str):
-        """Attach to a Chrome instance via CDP."""
-        self.attached_to_remote = True
+                self._startup_page = page
+        finally:
+            self._page_slots.release()
+            await self._release()
+
+    async def _acquire(self, headless: bool = False):
+        async with self._lock:
+            if self.browser is None:
+                try:
+                    await self._start(headless)
+                except Exception as exc:
+                    await self._shutdown()
+                    raise RuntimeError(f"Failed to launch automation Chrome: {exc}") from exc
+            self._users += 1
+
+    async def _release(self):
+        async with self._lock:
+            self._users -= 1
+            if self._users == 0:
+                await self._shutdown()
+
+    async def _start(self, headless: bool):
+        self.playwright = await async_playwright().start()
+        cdp_url = await self._launch_automation_chrome(headless)
+        self.log.info(f"Launching automation Chrome and attaching over CDP at {cdp_url}")
         self.browser = await self.playwright.chromium.connect_over_cdp(cdp_url)
 
         if self.browser.contexts:
@@ -111,19 +134,32 @@ class BaseCrawler(ABC):
         else:
             self.context = await self.browser.new_context()
         if self.context.pages:
-            self.page = self.context.pages[0]
-            self.created_page = False
-        else:
-            self.page = await self.context.new_page()
-            self.created_page = True
-        if self.page:
-            await self.page.bring_to_front()
+            self._startup_page = self.context.pages[0]
         await self._apply_stealth_scripts()
 
-    async def _ensure_automation_chrome(self) -> str:
-        """Launch a dedicated Chrome instance for automation if not already running."""
-        if self.chrome_remote_debug_url:
-            return self.chrome_remote_debug_url
+    async def _shutdown(self):
+        if self.browser:
+            try:
+                await self.browser.close()
+            except Exception:
+                pass
+        if self.chrome_process:
+            self.chrome_process.terminate()
+            try:
+                await asyncio.wait_for(self.chrome_process.wait(), timeout=5)
+            except asyncio.TimeoutError:
+                self.chrome_process.kill()
+                await self.chrome_process.wait()
+        if self.playwright:
+            await self.playwright.stop()
+        self.playwright = None
+        self.browser = None
+        self.context = None
+        self.chrome_process = None
+        self._startup_page = None
+
+    async def _launch_automation_chrome(self, headless: bool) -> str:
+        """Launch a dedicated Chrome instance for automation and return its CDP URL."""
 
         chrome_executable = '/Applications/Google Chrome Beta.app/Contents/MacOS/Google Chrome Beta'
         if not os.path.exists(chrome_executable):
@@ -135,7 +171,7 @@ class BaseCrawler(ABC):
         await self._terminate_existing_automation_chrome(user_data_dir)
 
         port = self._find_free_port()
-        self.chrome_remote_debug_url = f"http://127.0.0.1:{port}/"
+        cdp_url = f"http://127.0.0.1:{port}/"
 
 
         launch_args = [
@@ -153,7 +189,7 @@ class BaseCrawler(ABC):
             '--disable-sync',
         ]
 
-        if self.headless:
+        if headless:
             launch_args.append('--headless=new')
 
         self.chrome_process = await asyncio.create_subprocess_exec(
@@ -162,8 +198,8 @@ class BaseCrawler(ABC):
             stderr=asyncio.subprocess.DEVNULL
         )
 
-        await self._wait_for_cdp_ready(self.chrome_remote_debug_url)
-        return self.chrome_remote_debug_url
+        await self._wait_for_cdp_ready(cdp_url)
+        return cdp_url
 
     async def _terminate_existing_automation_chrome(self, user_data_dir: str):
         import subprocess
@@ -229,11 +265,8 @@ class BaseCrawler(ABC):
 
 
     async def _apply_stealth_scripts(self):
-        """Inject scripts to reduce automation detection."""
-        if not self.page:
-            return
-
-        await self.page.add_init_script("""
+        """Inject scripts to reduce automation detection into every tab of the context."""
+        await self.context.add_init_script("""
             // Remove webdriver property
             Object.defineProperty(navigator, 'webdriver', {
                 get: () => undefined,
@@ -274,7 +307,71 @@ class BaseCrawler(ABC):
                 get: () => 8,
             });
         """)
+
+
+browser_pool = BrowserPool()
+
+
+class BaseCrawler(ABC):
+    """Base class for all broker crawlers"""
+
+    # Resource types aborted before they hit the network. Stylesheets are kept because the
+    # crawlers wait on element visibility, which needs layout.
+    BLOCKED_RESOURCE_TYPES = frozenset({'image', 'font', 'media'})
     
+    def __init__(self, broker_name: str):
+        self.broker_name = broker_name
+        self.headless = False
+        self.db_manager = DatabaseManager()
+        self.browser: Optional[Browser] = None
+        self.context: Optional[BrowserContext] = None
+        self.page: Optional[Page] = None
+        self.created_page = False
+        self.background_tasks: List[asyncio.Task] = []
+        self.log = logging.getLogger(f"{self.__class__.__name__}[{broker_name}]")
+        
+    async def __aenter__(self):
+        """Async context manager entry"""
+        await self._setup_browser()
+        return self
+        
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Async context manager exit"""
+        # Let background work (e.g. debug dumps) finish before the page goes away
+        if self.background_tasks:
+            await asyncio.gather(*self.background_tasks, return_exceptions=True)
+            self.background_tasks.clear()
+        try:
+            await self._cleanup_browser()
+        finally:
+            self.db_manager.close()
+    
+    async def _setup_browser(self):
+        """Borrow a tab from the shared automation Chrome"""
+        self.browser, self.context, self.page, self.created_page = await browser_pool.acquire_page(self.headless)
+        await self.page.route("**/*", self._route_request)
+        await self.page.bring_to_front()
+
+    async def _cleanup_browser(self):
+        """Hand the tab back; Chrome itself is shut down by the pool once unused"""
+        if self.page is None:
+            return
+        page, self.page = self.page, None
+        try:
+            # The startup tab goes back to the pool, so don't leave our handler on it
+            await page.unroute("**/*", self._route_request)
+        except Exception:
+            pass
+        await browser_pool.release_page(page, self.created_page)
+
+    async def _route_request(self, route: Route):
+        """Abort requests the scrapers never read (media and trackers) so pages settle sooner"""
+        request = route.request
+        if request.resource_type in self.BLOCKED_RESOURCE_TYPES or _is_tracker_url(request.url):
+            await route.abort()
+        else:
+            await route.continue_()
+
     def _log_request(self, request):
         """Log outgoing requests for debugging"""
         self.log.debug(f"Request: {request.method} {request.url}")
@@ -301,6 +398,31 @@ class BaseCrawler(ABC):
             self.log.error(f"Failed to save session: {e}")
     
     
+    async def restore_session(self) -> bool:
+        """Seed the browser context with cookies from the last saved session"""
+        session = self.db_manager.get_session(self.broker_name)
+        if not session or not self.context:
+            return False
+
+        expires_at = session.get("expires_at")
+        if expires_at and datetime.fromisoformat(expires_at) <= datetime.now():
+            self.log.info("Stored session expired, clearing it")
+            self.db_manager.clear_session(self.broker_name)
+            return False
+
+        cookies = session["session_data"].get("cookies", [])
+        if not cookies:
+            return False
+
+        try:
+            await self.context.add_cookies(cookies)
+        except Exception as e:
+            self.log.warning(f"Failed to restore session cookies: {e}")
+            return False
+
+        self.log.info(f"Restored {len(cookies)} cookies from stored session")
+        return True
+
     def get_credentials(self) -> Optional[Dict[str, Any]]:
         """Get stored credentials for this broker"""
         return self.db_manager.get_credentials(self.broker_name)
@@ -313,9 +435,28 @@ class BaseCrawler(ABC):
         except Exception:
             return False
     
-    def parse_html_with_soup(self, html: str) -> BeautifulSoup:
-        """Parse HTML content with BeautifulSoup"""
-        return BeautifulSoup(html, 'lxml')
+    def debug_dump_path(self, name: str, suffix: str) -> Path:
+        """Timestamped dump path so repeated or concurrent runs don't overwrite each other"""
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+        return Path(f"{self.broker_name}_{name}_{timestamp}{suffix}")
+
+    async def dump_debug_html(self, name: str, html: str) -> Optional[Path]:
+        """Write gzipped HTML for offline debugging when CRAWLER_DEBUG_DUMP is set"""
+        if not debug_dump_enabled():
+            return None
+        path = self.debug_dump_path(name, '.html.gz')
+        # Page dumps can be megabytes; compress and write off the event loop
+        await asyncio.to_thread(self._write_gzip, path, html)
+        self.log.info("Saved debug HTML to %s", path)
+        return path
+
+    @staticmethod
+    def _write_gzip(path: Path, text: str):
+        path.write_bytes(gzip.compress(text.encode('utf-8')))
+
+    def parse_html_with_soup(self, html: str, parse_only: Optional[SoupStrainer] = None) -> BeautifulSoup:
+        """Parse HTML content with BeautifulSoup, optionally keeping only the strained elements"""
+        return BeautifulSoup(html, 'lxml', parse_only=parse_only)
     
     
     @abstractmethod
@@ -337,6 +478,10 @@ class BaseCrawler(ABC):
         """Main crawling method that orchestrates the entire process"""
         try:
             self.log.info("Starting crawl...")
+
+            # The CDP-attached context can't be created with storage_state, so replay
+            # the saved cookies into it before the login probe runs
+            await self.restore_session()
             
             # Attempt login (login method handles navigation)
             login_success = await self.login()
@@ -350,9 +495,8 @@ class BaseCrawler(ABC):
             
             # Save session after successful login
             await self.save_session()
-            self.log.info("Waiting 10 seconds for redirection just in case")
-            await asyncio.sleep(10) # wait for the redirection, if any
-            # Scrape portfolio data
+            # Scrape portfolio data; each crawler waits for its own holdings selectors
+            # rather than sleeping through any post-login redirect
             holdings = await self.scrape_portfolio()
             
             self.log.info(f"Successfully scraped {len(holdings)} holdings")
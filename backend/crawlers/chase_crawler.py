@@ -1,8 +1,9 @@
 from typing import List, Dict, Any, Optional
 import asyncio
+from functools import lru_cache
 import re
 from bs4 import BeautifulSoup
-from playwright.async_api import async_playwright
+from playwright.async_api import async_playwright, Error as PlaywrightError
 from datetime import datetime, timedelta
 
 import sys
@@ -12,6 +13,54 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from crawlers.base_crawler import BaseCrawler
 from models.portfolio import Holding
 
+_DASHBOARD_SELECTOR = '.accounts-group-accordion-container'
+_LOGIN_IFRAME_SELECTOR = 'iframe#logonbox'
+_HOLDINGS_ROW_SELECTOR = 'table#ssv-table tbody tr'
+_POSITIONS_ROUTE = '#/dashboard/oi-portfolio/positions'
+
+_DASHBOARD_URL_RE = re.compile(r'dashboard/overview$')
+_BODY_TEXT_JS = "() => document.body ? document.body.innerText : ''"
+_TFA_RE = re.compile(r'we need to confirm your identity', re.IGNORECASE)
+
+# Number cleaning helpers: formatting characters go in one str.translate pass
+_DECIMAL_STRIP = str.maketrans('', '', '$,()')
+_PERCENT_STRIP = str.maketrans('', '', '%+()')
+_NUMBER_RE = re.compile(r'-?\d+\.?\d*')
+_FIRST_PRICE_RE = re.compile(r'^(\d+\.?\d*)')
+
+# Candidate selectors for the login form inside the iframe, joined once into CSS unions
+_USERNAME_SELECTORS = (
+    'input[name="userId"]',
+    'input[id="userId"]',
+    '#userId',
+    'input[type="text"][autocomplete="username"]',
+    'input[type="text"]',
+)
+_PASSWORD_SELECTORS = (
+    'input[name="password"]',
+    'input[id="password"]',
+    '#password',
+    'input[type="password"]',
+)
+_LOGIN_BUTTON_SELECTORS = (
+    'button[type="submit"]',
+    'input[type="submit"]',
+    'button:has-text("Sign in")',
+    'button:has-text("Log in")',
+    '#logon-button',
+    'input[value*="Sign"]',
+)
+_LOGIN_BUTTON_FALLBACK = 'button'
+_USERNAME_UNION = ', '.join(_USERNAME_SELECTORS)
+_PASSWORD_UNION = ', '.join(_PASSWORD_SELECTORS)
+_LOGIN_BUTTON_UNION = ', '.join(_LOGIN_BUTTON_SELECTORS)
+
+# The login iframe is usable once it has both a text/email field and a password field
+_LOGIN_FORM_READY_JS = """
+() => !!document.querySelector('input[type="password"]')
+    && !!document.querySelector('input[type="text"], input[type="email"]')
+"""
+
 
 class ChaseCrawler(BaseCrawler):
     """Chase Self-Direct Investment crawler"""
@@ -31,11 +80,14 @@ class ChaseCrawler(BaseCrawler):
         self.log.info("Starting Chase holdings scrape...")
         
         
-        self.log.info("Navigating to portfolio page...")
-        
-        # Navigate to the single portfolio page that shows all holdings
-        await self.page.goto(self.portfolio_url, wait_until='networkidle')
-        await asyncio.sleep(5)
+        # Navigate to the single portfolio page that shows all holdings, unless a restored
+        # session already left us on it
+        if _POSITIONS_ROUTE not in self.page.url:
+            self.log.info("Navigating to portfolio page...")
+            await self.page.goto(self.portfolio_url, wait_until='domcontentloaded')
+        # The positions table rows are the readiness signal; the SPA keeps polling in the
+        # background, so networkidle only adds dead time
+        await self.page.wait_for_selector(_HOLDINGS_ROW_SELECTOR, timeout=30000)
         
         # Get page HTML
         html = await self.page.content()
@@ -54,10 +106,16 @@ class ChaseCrawler(BaseCrawler):
         # First check if we're already logged in with a valid session
         try:
             await self.page.goto(self.login_url, wait_until='domcontentloaded')
-            await asyncio.sleep(5)
+            # The page settles on either the dashboard or the logon iframe
+            try:
+                await self.page.wait_for_selector(
+                    f"{_DASHBOARD_SELECTOR}, {_LOGIN_IFRAME_SELECTOR}", timeout=15000
+                )
+            except PlaywrightError:
+                pass  # Let the iframe wait below report the failure
             # If we're already on the dashboard, we're logged in
             # Look for the accounts accordion container which indicates we're on the dashboard
-            dashboard_element = await self.page.query_selector('.accounts-group-accordion-container')
+            dashboard_element = await self.page.query_selector(_DASHBOARD_SELECTOR)
             if dashboard_element:
                 self.log.info("Already logged in with stored session!")
                 return True
@@ -73,19 +131,14 @@ class ChaseCrawler(BaseCrawler):
         password = credentials['password']
         
         try:
-            # Wait for page to fully load and check for redirects
             current_url = self.page.url
             self.log.debug(f"Current URL: {current_url}")
             
-            # Chase might redirect to a different login page
-            if "logon" in current_url.lower():
-                await asyncio.sleep(3)
-            
             # Wait for login iframe to load
             self.log.debug("Looking for login iframe...")
             
             # Wait for the iframe to appear
-            iframe_selector = 'iframe#logonbox'
+            iframe_selector = _LOGIN_IFRAME_SELECTOR
             if not await self.wait_for_element(iframe_selector, timeout=15000):
                 raise RuntimeError("Login iframe not found")
             
@@ -99,95 +152,34 @@ class ChaseCrawler(BaseCrawler):
             if not iframe_frame:
                 raise RuntimeError("Could not get iframe content frame")
             
-            # Wait for login form elements inside the iframe
-            form_loaded = False
-            max_attempts = 3
-            
-            for attempt in range(max_attempts):
-                all_inputs = await iframe_frame.query_selector_all('input')
-                if len(all_inputs) > 0:
-                    form_loaded = True
-                    break
-                await asyncio.sleep(2)
-            
-            if not form_loaded:
-                raise RuntimeError("Login form never loaded in iframe")
-            
-            # Wait for login form to load - Chase uses specific selectors
-            username_selectors = [
-                'input[name="userId"]',
-                'input[id="userId"]', 
-                '#userId',
-                'input[type="text"][autocomplete="username"]',
-                'input[type="text"]'
-            ]
-            
-            password_selectors = [
-                'input[name="password"]',
-                'input[id="password"]',
-                '#password',
-                'input[type="password"]'
-            ]
-            
-            # Fill login form
-            
-            # Wait for username field in iframe
-            username_found = False
-            for selector in username_selectors:
-                try:
-                    # Check if element exists in iframe
-                    element = await iframe_frame.query_selector(selector)
-                    if element:
-                        await iframe_frame.fill(selector, username)
-                        username_found = True
-                        break
-                except Exception:
-                    continue
-            
-            if not username_found:
-                raise RuntimeError("Username field not found in iframe")
-            
-            # Wait for password field in iframe
-            password_found = False
-            for selector in password_selectors:
-                try:
-                    # Check if element exists in iframe
-                    element = await iframe_frame.query_selector(selector)
-                    if element:
-                        await iframe_frame.fill(selector, password)
-                        password_found = True
-                        break
-                except Exception:
-                    continue
-            
-            if not password_found:
-                raise RuntimeError("Password field not found in iframe")
-            
-            # Click login button in iframe
-            login_button_selectors = [
-                'button[type="submit"]',
-                'input[type="submit"]',
-                'button:has-text("Sign in")',
-                'button:has-text("Log in")',
-                '#logon-button',
-                'button',  # fallback to any button
-                'input[value*="Sign"]'  # fallback to input with "Sign" in value
-            ]
+            # Wait for login form elements inside the iframe; one in-page check per poll
+            # instead of pulling every input back as an element handle
+            try:
+                await iframe_frame.wait_for_function(_LOGIN_FORM_READY_JS, timeout=15000)
+            except PlaywrightError as e:
+                raise RuntimeError("Login form never loaded in iframe") from e
             
-            login_button_found = False
-            for selector in login_button_selectors:
-                try:
-                    # Check if element exists in iframe
-                    element = await iframe_frame.query_selector(selector)
-                    if element:
-                        await iframe_frame.click(selector)
-                        login_button_found = True
-                        break
-                except Exception:
-                    continue
+            # Each field is located with one CSS union instead of probing the candidate
+            # selectors one round trip at a time
+            try:
+                await iframe_frame.locator(_USERNAME_UNION).first.fill(username, timeout=5000)
+            except PlaywrightError as e:
+                raise RuntimeError("Username field not found in iframe") from e
             
-            if not login_button_found:
-                raise RuntimeError("Could not find login button in iframe")
+            try:
+                await iframe_frame.locator(_PASSWORD_UNION).first.fill(password, timeout=5000)
+            except PlaywrightError as e:
+                raise RuntimeError("Password field not found in iframe") from e
+            
+            # Click login button in iframe; any button is only a fallback when none of the
+            # sign-in candidates match, since the union would otherwise pick by document order
+            login_button = iframe_frame.locator(_LOGIN_BUTTON_UNION).first
+            if await login_button.count() == 0:
+                login_button = iframe_frame.locator(_LOGIN_BUTTON_FALLBACK).first
+            try:
+                await login_button.click(timeout=5000)
+            except PlaywrightError as e:
+                raise RuntimeError("Could not find login button in iframe") from e
             
             # Check if we're on the dashboard or need 2FA
             current_url = self.page.url
@@ -219,25 +211,18 @@ class ChaseCrawler(BaseCrawler):
     
     async def handle_2fa_if_needed(self) -> bool:
         """Handle 2FA if required"""
-        # Check if we're on a 2FA page by looking for the specific text in page content and iframes
+        # Check if we're on a 2FA page by looking for the specific text in the page and its
+        # iframes. Only rendered text is pulled back, not the serialized HTML.
         is_2fa_required = False
-        
-        # Check main page content
-        page_content = await self.page.content()
-        if "we need to confirm your identity" in page_content.lower():
-            is_2fa_required = True
-        else:
-            # Check all iframes
-            frames = self.page.frames
-            for frame in frames:
-                try:
-                    frame_content = await frame.content()
-                    if "we need to confirm your identity" in frame_content.lower():
-                        is_2fa_required = True
-                        break
-                except Exception:
-                    # Skip frames that can't be accessed
-                    continue
+        for frame in self.page.frames:  # includes the main frame
+            try:
+                frame_text = await frame.evaluate(_BODY_TEXT_JS)
+            except PlaywrightError:
+                # Skip frames that can't be accessed
+                continue
+            if _TFA_RE.search(frame_text):
+                is_2fa_required = True
+                break
         
         if not is_2fa_required:
             # No 2FA required, we're good to go
@@ -251,27 +236,14 @@ class ChaseCrawler(BaseCrawler):
         
         # Wait for user to complete 2FA - page should redirect to dashboard/overview
         max_wait_time = 300  # 5 minutes
-        wait_interval = 2
-        elapsed_time = 0
-        
-        while elapsed_time < max_wait_time:
-            await asyncio.sleep(wait_interval)
-            elapsed_time += wait_interval
-            
-            # Check if we've been redirected to dashboard/overview
-            current_url = self.page.url
-            if current_url.endswith('dashboard/overview'):
-                self.log.info("✅ 2FA completed successfully!")
-                return True
-            
-            # Show progress every 30 seconds
-            if elapsed_time % 30 == 0:
-                remaining = (max_wait_time - elapsed_time) // 60
-                self.log.info(f"⏳ Still waiting for 2FA completion... ({remaining} minutes remaining)")
-                self.log.debug(f"   Current URL: {current_url}")
-        
-        self.log.error(f"⏰ 2FA timeout after {max_wait_time//60} minutes")
-        return False
+        try:
+            await self.page.wait_for_url(_DASHBOARD_URL_RE, timeout=max_wait_time * 1000)
+        except PlaywrightError:
+            self.log.error(f"⏰ 2FA timeout after {max_wait_time//60} minutes")
+            return False
+
+        self.log.info("✅ 2FA completed successfully!")
+        return True
     
     
     async def parse_portfolio_html(self, html: str) -> List[Holding]:
@@ -466,7 +438,9 @@ class ChaseCrawler(BaseCrawler):
             self.log.error(f"Error parsing cash row: {e}")
             return None
     
-    def _clean_decimal_text(self, value_str: str) -> float:
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _clean_decimal_text(value_str: str) -> float:
         """Clean text and extract decimal value, handling Chase-specific formatting"""
         if not value_str:
             raise ValueError("Value string cannot be empty")
@@ -475,17 +449,14 @@ class ChaseCrawler(BaseCrawler):
         value_str = value_str.strip()
         
         # Handle negative values in parentheses
-        is_negative = False
-        if '(' in value_str and ')' in value_str:
-            is_negative = True
-            value_str = value_str.replace('(', '').replace(')', '')
+        is_negative = '(' in value_str and ')' in value_str
         
-        # Remove currency symbols, commas
-        cleaned = re.sub(r'[$,]', '', value_str)
+        # Remove parentheses, currency symbols and commas in one pass
+        cleaned = value_str.translate(_DECIMAL_STRIP)
         
         # Extract only the numeric part (handle cases like "63.41Loss" or "63.41Gain")
         # Look for the first decimal number in the string
-        number_match = re.search(r'-?\d+\.?\d*', cleaned)
+        number_match = _NUMBER_RE.search(cleaned)
         if number_match:
             number_str = number_match.group()
             try:
@@ -502,7 +473,7 @@ class ChaseCrawler(BaseCrawler):
             raise ValueError("Price text cannot be empty")
         
         # Look for the first decimal number at the beginning of the string
-        number_match = re.match(r'^(\d+\.?\d*)', price_text.strip())
+        number_match = _FIRST_PRICE_RE.match(price_text.strip())
         if number_match:
             try:
                 return float(number_match.group(1))
@@ -567,7 +538,9 @@ class ChaseCrawler(BaseCrawler):
         except Exception as e:
             raise RuntimeError(f"Error parsing totals row: {e}") from e
 
-    def _clean_percentage_text(self, value_str: str) -> float:
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _clean_percentage_text(value_str: str) -> float:
         """Clean percentage text and convert to Decimal (as decimal, not percentage)"""
         if not value_str:
             raise ValueError("Percentage string cannot be empty")
@@ -575,22 +548,15 @@ class ChaseCrawler(BaseCrawler):
         # Remove whitespace
         value_str = value_str.strip()
         
-        # Handle negative values in parentheses or with "Loss of" prefix
-        is_negative = False
-        if '(' in value_str and ')' in value_str:
-            is_negative = True
-            value_str = value_str.replace('(', '').replace(')', '')
-        elif 'Loss of' in value_str:
-            is_negative = True
-            value_str = value_str.replace('Loss of', '').strip()
-        elif 'Gain of' in value_str:
-            value_str = value_str.replace('Gain of', '').strip()
+        # Handle negative values in parentheses or with "Loss of" prefix. The "Loss of" /
+        # "Gain of" words themselves never match the number pattern, so they can stay.
+        is_negative = ('(' in value_str and ')' in value_str) or 'Loss of' in value_str
         
-        # Remove percentage symbol and other formatting
-        cleaned = re.sub(r'[%+]', '', value_str)
+        # Remove parentheses, percentage symbol and other formatting in one pass
+        cleaned = value_str.translate(_PERCENT_STRIP)
         
         # Extract the numeric part
-        number_match = re.search(r'-?\d+\.?\d*', cleaned)
+        number_match = _NUMBER_RE.search(cleaned)
         if number_match:
             number_str = number_match.group()
             try:
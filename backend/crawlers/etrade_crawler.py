@@ -1,19 +1,177 @@
-from typing import List
+from typing import List, Optional, Tuple
 import asyncio
-import re
-import random
 
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from crawlers.base_crawler import BaseCrawler
+from playwright.async_api import Error as PlaywrightError
+
+from crawlers.base_crawler import BaseCrawler, DEBUG_DUMP_ENV, debug_dump_enabled
 from models.portfolio import Holding
 
+# Installed once per page via add_init_script so every scrape reuses the compiled functions.
+# Numbers are parsed in the page so Python receives floats (or null for blank/unparseable cells).
+_EXTRACT_POSITIONS_JS = r'''
+(() => {
+  // One DOM walk per row: aria-colindex -> trimmed cell text (first match wins, like querySelector)
+  const readCells = (row) => {
+    const cells = {};
+    for (const cell of row.querySelectorAll('[aria-colindex]')) {
+      const colIndex = cell.getAttribute('aria-colindex');
+      if (!(colIndex in cells)) cells[colIndex] = (cell.innerText || '').trim();
+    }
+    return cells;
+  };
+
+  const FORMATTING_RE = /[$,+%]/g;
+  const NUMBER_RE = /-?\d+\.?\d*/;
+
+  // "$1,234.50" -> 1234.5, "(2.00)" -> -2, "--" -> null
+  const toDecimal = (text) => {
+    if (!text) return null;
+    let cleaned = text.replace(FORMATTING_RE, '');
+    let negative = false;
+    if (cleaned.startsWith('(') && cleaned.endsWith(')')) {
+      negative = true;
+      cleaned = cleaned.slice(1, -1);
+    }
+    const match = NUMBER_RE.exec(cleaned);
+    if (!match) return null;
+    const value = parseFloat(match[0]);
+    return negative ? -value : value;
+  };
+
+  // "16.67%" -> 0.1667
+  const toPercent = (text) => {
+    const value = toDecimal(text);
+    return value === null ? null : value / 100;
+  };
+
+  const getGrid = () => document.querySelector('div[role="grid"][aria-label="Portfolios"]');
+
+  window.__extractEtradePositions = () => {
+    const grid = getGrid();
+    if (!grid) return {rows: [], totals: null};
+
+    const rows = Array.from(grid.querySelectorAll('div[role="row"][aria-rowindex]'))
+      .filter(row => row.querySelector('[role="gridcell"]') || row.querySelector('[role="rowheader"]'));
+
+    const results = [];
+    let totals = null;
+    for (const row of rows) {
+      const symbolCell = row.querySelector('[role="rowheader"][aria-colindex="1"]');
+      if (!symbolCell) continue;
+      const cells = readCells(row);
+
+      // Check for cash row first by looking for the cash wrapper
+      const cashWrapper = symbolCell.querySelector('.FooterCellRenderer---cash-and-transfer-wrapper---ISxOD');
+      if (cashWrapper) {
+        // This is definitely the cash row - extract the cash value
+        const cashText = cells[11];
+        if (cashText) {
+          results.push(['Cash', 'Cash & sweep funds', null, null, null, null, null, null, null, null, toDecimal(cashText)]);
+          continue;
+        }
+      }
+
+      // Total rows are not holdings; keep the overall "Total" (not "Cash Total") for the sanity check
+      const totalWrapper = symbolCell.querySelector('.FooterCellRenderer---cash-and-total---hAWG4');
+      if (totalWrapper) {
+        const text = symbolCell.textContent.trim().toLowerCase();
+        if (text.includes('total')) {
+          if (!totals && (text === 'total' || !text.includes('cash'))) {
+            totals = {
+              market_value: toDecimal(cells[7]),        // Column 7: Total Cost (market value)
+              unrealized_gain_loss: toDecimal(cells[9]), // Column 9: Total Gain $
+              total_value: toDecimal(cells[11]),        // Column 11: Value $
+            };
+          }
+          continue;
+        }
+      }
+
+      // Regular stock rows
+      const symbolLink = symbolCell.querySelector('a');
+      const symbolText = symbolLink ? (symbolLink.textContent || '') : (symbolCell.textContent || '');
+      const symbol = symbolText.trim();
+      if (!symbol) continue;
+
+      const rawDescription = symbolLink ? (symbolLink.getAttribute('title') || symbolLink.getAttribute('aria-label') || '') : '';
+
+      // Positional layout must match ROW_FIELDS
+      results.push([
+        symbol,
+        rawDescription.trim(),
+        toDecimal(cells[3]),   // last price
+        toDecimal(cells[4]),   // day change $ (per share)
+        toPercent(cells[5]),   // day change %
+        toDecimal(cells[6]),   // quantity
+        toDecimal(cells[7]),   // cost per share
+        toDecimal(cells[8]),   // day's gain $
+        toDecimal(cells[9]),   // total gain $
+        toPercent(cells[10]),  // total gain %
+        toDecimal(cells[11]),  // value $
+      ]);
+    }
+
+    return {rows: results, totals};
+  };
+})();
+'''
+
+_GRID_SELECTOR = 'div[role="grid"][aria-label="Portfolios"]'
+# Row 1 is the header; row 2 only exists once React has populated the grid body
+_FIRST_DATA_ROW_SELECTOR = f'{_GRID_SELECTOR} div[role="row"][aria-rowindex="2"]'
+
+# Ready once React has rendered data rows and the totals footer the sanity check reads
+_GRID_READY_JS = r'''
+() => {
+  const grid = document.querySelector('div[role="grid"][aria-label="Portfolios"]');
+  if (!grid) return false;
+  const rows = grid.querySelectorAll('div[role="row"][aria-rowindex]');
+  return rows.length >= 2 && !!grid.querySelector('.FooterCellRenderer---cash-and-total---hAWG4');
+}
+'''
+
+_GRID_HTML_JS = "() => document.querySelector('div[role=\"grid\"]')?.outerHTML || ''"
+
+# Order of the cells in each row returned by the extractor
+ROW_FIELDS = (
+    "symbol",
+    "description",
+    "last_price",
+    "day_change_dollars",
+    "day_change_percent",
+    "quantity",
+    "cost_per_share",
+    "day_gain_dollars",
+    "total_gain",
+    "total_gain_percent",
+    "value",
+)
+
+# Grid rows that are not regular positions: action rows to skip, plus the cash row
+_NON_POSITION_LABELS = frozenset({"transfer money", "add cash", "withdraw", "cash"})
+
 
 class EtradeCrawler(BaseCrawler):
     """E*TRADE crawler"""
 
+    _CASH_TEMPLATE = Holding(
+        symbol="USD_CASH",
+        description="Cash & sweep funds",
+        quantity=0.0,
+        price=1.00,  # Cash price is always $1
+        unit_cost=1.00,  # Unit cost is always $1 for cash
+        cost_basis=0.0,
+        current_value=0.0,
+        day_change_percent=0.00,  # Cash doesn't have daily changes
+        day_change_dollars=0.00,  # Cash doesn't have daily changes
+        unrealized_gain_loss=0.00,  # Cash has no unrealized gain/loss
+        unrealized_gain_loss_percent=0.00,  # Cash has no unrealized gain/loss
+    )
+
     def __init__(self):
         super().__init__("etrade")
         # Login URL provided with redirect target to positions page
@@ -22,6 +180,8 @@ class EtradeCrawler(BaseCrawler):
             "https%3A%2F%2Fus.etrade.com%2Fetx%2Fpxy%2Fportfolios%2Fpositions"
         )
         self.portfolio_url = "https://us.etrade.com/etx/pxy/portfolios/positions"
+        self._debug_lock = asyncio.Lock()
+        self._extractor_installed = False
 
     def get_login_url(self) -> str:
         """Get E*TRADE login URL"""
@@ -31,33 +191,52 @@ class EtradeCrawler(BaseCrawler):
         """Scrape holdings from E*TRADE positions page"""
         self.log.info("Starting E*TRADE holdings scrape...")
 
-        self.log.info("Navigating to portfolio positions page...")
-        await self.page.goto(self.portfolio_url, wait_until='networkidle')
-        await self.page.wait_for_load_state('networkidle', timeout=15000)
+        await self._install_extractor()
 
+        self.log.info("Navigating to portfolio positions page...")
+        # The page streams quotes, so networkidle rarely settles; wait for data rows instead
+        await self.page.goto(self.portfolio_url, wait_until='domcontentloaded')
+        await self.page.wait_for_selector(_FIRST_DATA_ROW_SELECTOR, state='visible', timeout=20000)
 
         holdings = await self.parse_portfolio_html()
 
-        self.log.info(f"Found {len(holdings)} total holdings")
+        self.log.info("Found %d total holdings", len(holdings))
         return holdings
 
+    async def _install_extractor(self) -> None:
+        """Register the positions extractor; it takes effect on the next navigation."""
+        if self._extractor_installed:
+            return
+        await self.page.add_init_script(script=_EXTRACT_POSITIONS_JS)
+        self._extractor_installed = True
+
+    async def _is_session_valid(self) -> bool:
+        """Probe the positions URL without loading the page.
+
+        The API request shares the page's cookies, so a 200 on the positions URL itself
+        (rather than a redirect to login) means the stored session is still good.
+        """
+        try:
+            response = await self.page.request.get(self.portfolio_url, max_redirects=0)
+        except PlaywrightError as e:
+            self.log.debug("Session probe failed: %s", e)
+            return False
+        return response.status == 200 and '/portfolios/positions' in response.url
+
     async def login(self) -> bool:
         """Login to E*TRADE"""
         self.log.info("Starting E*TRADE login...")
 
         # First check if we're already logged in with a valid session
-        try:
-            await self.page.goto(self.login_url, wait_until='domcontentloaded')
-            await self.page.wait_for_load_state('networkidle', timeout=15000)
+        if await self._is_session_valid():
+            self.log.info("Already logged in with stored session!")
+            return True
 
-            # If redirected straight to positions page, we're logged in
-            if "/portfolios/positions" in self.page.url.lower():
-                self.log.info("Already logged in with stored session!")
-                return True
-        except Exception:
-            pass
+        # Credential lookup hits sqlite + Fernet; overlap it with the login page load
+        credentials_task = asyncio.create_task(asyncio.to_thread(self.get_credentials))
+        await self.page.goto(self.login_url, wait_until='domcontentloaded')
 
-        credentials = self.get_credentials()
+        credentials = await credentials_task
         if not credentials:
             raise RuntimeError("No credentials found")
 
@@ -71,45 +250,71 @@ class EtradeCrawler(BaseCrawler):
             password_selector = '#password'
             login_button_selector = '#mfaLogonButton'
 
-            if not await self.wait_for_element(username_selector, timeout=20000):
+            # The form fields render together, so wait for all of them at once
+            username_found, password_found, login_button_found = await asyncio.gather(
+                self.wait_for_element(username_selector, timeout=20000),
+                self.wait_for_element(password_selector, timeout=20000),
+                self.wait_for_element(login_button_selector, timeout=15000),
+            )
+            if not username_found:
                 raise RuntimeError(f"Username field not found: {username_selector}")
-            if not await self.wait_for_element(password_selector, timeout=20000):
+            if not password_found:
                 raise RuntimeError(f"Password field not found: {password_selector}")
+            if not login_button_found:
+                raise RuntimeError(f"Login button not found: {login_button_selector}")
 
             try:
                 await self.page.fill(username_selector, username)
-                self.log.debug(f"Filled username in {username_selector}")
+                self.log.debug("Filled username in %s", username_selector)
             except Exception as e:
                 raise RuntimeError(f"Error filling username field: {e}") from e
 
             try:
                 await self.page.fill(password_selector, password)
-                self.log.debug(f"Filled password in {password_selector}")
+                self.log.debug("Filled password in %s", password_selector)
             except Exception as e:
                 raise RuntimeError(f"Error filling password field: {e}") from e
 
-            if not await self.wait_for_element(login_button_selector, timeout=15000):
-                raise RuntimeError(f"Login button not found: {login_button_selector}")
-
             try:
-                await self.page.click(login_button_selector, delay=random.randint(100, 200))
-                self.log.debug(f"Clicked login button {login_button_selector}")
+                await self.page.click(login_button_selector)
+                self.log.debug("Clicked login button %s", login_button_selector)
             except Exception as e:
                 raise RuntimeError(f"Error clicking login button: {e}") from e
 
+            # Up to 5 minutes so there is time to complete MFA by hand
+            self.log.info("Waiting for positions page to load...")
+            await self._wait_for_positions_page(timeout=5 * 60)
+            self.log.info("Login successful - reached positions page")
+            return True
+        except Exception as e:
+            raise
+
+    async def _wait_for_positions_page(self, timeout: float) -> None:
+        """Poll until the positions page shows up, backing off from 0.25s to 4s.
+
+        Either the URL or the rendered grid counts: React routing can leave the URL
+        stale after the MFA redirects settle.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        poll_interval = 0.25
+
+        while True:
+            current_url = self.page.url
+            if "/portfolios/positions" in current_url.lower():
+                return
             try:
-                self.log.info("Waiting for positions page to load...")
-                await self.page.wait_for_url("**/portfolios/positions*", timeout=5 * 60000)
-            except Exception as e:
-                raise RuntimeError(f"Error waiting for positions URL: {e}") from e
+                if await self.page.query_selector(_GRID_SELECTOR):
+                    return
+            except PlaywrightError:
+                # The page is mid-navigation; try again on the next tick
+                pass
 
-            if "/portfolios/positions" in self.page.url.lower():
-                self.log.info("Login successful - reached positions page")
-                return True
+            if loop.time() >= deadline:
+                raise RuntimeError(f"Login failed - positions page not reached, last URL: {current_url}")
 
-            raise RuntimeError(f"Login failed - unexpected URL: {self.page.url}")
-        except Exception as e:
-            raise
+            await asyncio.sleep(poll_interval)
+            poll_interval = min(poll_interval * 2, 4.0)
 
     async def parse_portfolio_html(self) -> List[Holding]:
         """Parse the E*TRADE positions page.
@@ -118,90 +323,71 @@ class EtradeCrawler(BaseCrawler):
         fails we save debug artifacts to help refine the selectors.
         """
 
-        return await self._parse_positions_from_dom()
+        try:
+            return await self._parse_positions_from_dom()
+        except Exception:
+            if debug_dump_enabled():
+                # Dump in the background so the failure surfaces immediately
+                self.background_tasks.append(asyncio.create_task(self._save_debug_artifacts()))
+            else:
+                self.log.info("Set %s=1 to save E*TRADE debug artifacts", DEBUG_DUMP_ENV)
+            raise
 
-    async def _parse_positions_from_dom(self) -> List[Holding]:
-        grid_selector = 'div[role="grid"][aria-label="Portfolios"]'
-        row_selector = f"{grid_selector} div[role='row'][aria-rowindex]"
-        # Wait for the grid to be loaded by React
-        await self.page.wait_for_selector(row_selector, timeout=20000)
+    async def _save_debug_artifacts(self) -> None:
+        """Save the page HTML, the grid HTML and a screenshot for selector debugging."""
+        async with self._debug_lock:
+            try:
+                html, grid_html, _ = await asyncio.gather(
+                    self.page.content(),
+                    self.page.evaluate(_GRID_HTML_JS),
+                    self.page.screenshot(path=self.debug_dump_path('debug', '.png'), full_page=True),
+                )
+                await asyncio.gather(
+                    self.dump_debug_html('dom_dump', html),
+                    self.dump_debug_html('grid_dump', grid_html),
+                )
+                self.log.info("Saved E*TRADE debug artifacts")
+            except Exception as exc:
+                self.log.warning("Failed to save debug artifacts: %s", exc)
 
-        raw_rows = await self._extract_positions_data_via_js()
+    async def _parse_positions_from_dom(self) -> List[Holding]:
+        await self.page.wait_for_function(_GRID_READY_JS, timeout=20000, polling=250)
+        raw_rows, totals = await self._extract_positions_data_via_js()
         if not raw_rows:
             self.log.warning("No portfolio rows found in React grid")
             return []
 
-        def get_value(row: dict, key: str) -> str:
-            return (row.get(key) or "").strip()
-
-        def parse_decimal(row: dict, key: str, symbol: str) -> float:
-            value = get_value(row, key)
-            if not value:
-                raise ValueError(f"Missing value for {key} (symbol={symbol})")
-            return self._clean_decimal_text(value)
-
-        def parse_percent(row: dict, key: str, symbol: str) -> float:
-            value = get_value(row, key)
-            if not value:
-                raise ValueError(f"Missing value for {key} (symbol={symbol})")
-            return self._clean_percentage_text(value)
-
-        def parse_decimal_optional(row: dict, key: str, symbol: str) -> float:
-            value = get_value(row, key)
-            if not value:
-                return 0.0
-            try:
-                return self._clean_decimal_text(value)
-            except ValueError as exc:
-                self.log.warning(f"Skipping decimal field {key} for {symbol}: {exc}")
-                return 0.0
-
-        def parse_percent_optional(row: dict, key: str, symbol: str) -> float:
-            value = get_value(row, key)
-            if not value:
-                return 0.0
-            try:
-                return self._clean_percentage_text(value)
-            except ValueError as exc:
-                self.log.warning(f"Skipping percent field {key} for {symbol}: {exc}")
-                return 0.0
-
-        non_holding_labels = {
-            "transfer money",
-            "add cash",
-            "withdraw",
-        }
-
         holding_list: List[Holding] = []
-        for row in raw_rows:
-            symbol = get_value(row, "symbol")
+        # Running totals for the sanity check, accumulated while the rows are built
+        computed_total_value = 0.0
+        computed_unrealized_gain = 0.0
+        # Numeric cells arrive as floats, or None when blank or unparseable
+        for (symbol, description, price, _day_change, day_change_percent, quantity,
+             unit_cost, day_change_dollars, unrealized_gain_loss,
+             unrealized_gain_loss_percent, current_value) in raw_rows:
             if not symbol:
                 raise ValueError("Symbol is required for every row")
-            if symbol.lower() in non_holding_labels:
-                continue
-            
-            # Check if this is a cash position
-            if symbol.lower() == "cash":
-                cash_holding = self._parse_cash_position(row)
-                if cash_holding:
-                    holding_list.append(cash_holding)
+            # Symbols are already trimmed by the extractor
+            label = symbol.lower()
+            if label in _NON_POSITION_LABELS:
+                if label == "cash":
+                    cash_holding = self._parse_cash_position(current_value)
+                    if cash_holding:
+                        holding_list.append(cash_holding)
+                        computed_total_value += cash_holding.current_value
                 continue
 
-            description = get_value(row, "description") or symbol
+            description = description or symbol
 
-            try:
-                quantity = parse_decimal(row, "quantity", symbol)
-                price = parse_decimal(row, "last_price", symbol)
-                current_value = parse_decimal(row, "value", symbol)
-            except ValueError as exc:
-                self.log.warning(f"Skipping row for {symbol}: {exc}")
+            if quantity is None or price is None or current_value is None:
+                self.log.warning("Skipping row for %s: missing quantity, price or value", symbol)
                 continue
 
-            unit_cost = parse_decimal_optional(row, "cost_per_share", symbol)
-            day_change_dollars = parse_decimal_optional(row, "day_gain_dollars", symbol)
-            day_change_percent = parse_percent_optional(row, "day_change_percent", symbol)
-            unrealized_gain_loss = parse_decimal_optional(row, "total_gain", symbol)
-            unrealized_gain_loss_percent = parse_percent_optional(row, "total_gain_percent", symbol)
+            unit_cost = unit_cost or 0.0
+            day_change_dollars = day_change_dollars or 0.0
+            day_change_percent = day_change_percent or 0.0
+            unrealized_gain_loss = unrealized_gain_loss or 0.0
+            unrealized_gain_loss_percent = unrealized_gain_loss_percent or 0.0
             # Total cost can't be displayed in the all positions view, so we need to calculate it
             cost_basis = quantity * unit_cost
 
@@ -221,171 +407,54 @@ class EtradeCrawler(BaseCrawler):
                     brokers={self.broker_name: current_value},
                 )
             )
+            computed_total_value += current_value
+            computed_unrealized_gain += unrealized_gain_loss
 
         # Perform sanity check
-        await self.sanity_check(holding_list)
+        self.sanity_check(computed_total_value, computed_unrealized_gain, totals)
         
         return holding_list
 
-    def _parse_cash_position(self, row: dict) -> Holding:
-        """Parse a cash position from E*Trade data"""
-        try:
-            def get_value(key: str) -> str:
-                return (row.get(key) or "").strip()
-            
-            # Try to get cash amount from value field
-            cash_value_text = get_value("value")
-            if not cash_value_text:
-                return None
-            
-            cash_amount = self._clean_decimal_text(cash_value_text)
-            if cash_amount <= 0:
-                return None
-            
-            # Create cash holding
-            holding = Holding(
-                symbol="USD_CASH",
-                description="Cash & sweep funds",
-                quantity=cash_amount,  # Cash quantity equals the dollar amount
-                price=1.00,  # Cash price is always $1
-                unit_cost=1.00,  # Unit cost is always $1 for cash
-                cost_basis=cash_amount,  # Cost basis equals current value for cash
-                current_value=cash_amount,
-                day_change_percent=0.00,  # Cash doesn't have daily changes
-                day_change_dollars=0.00,  # Cash doesn't have daily changes
-                unrealized_gain_loss=0.00,  # Cash has no unrealized gain/loss
-                unrealized_gain_loss_percent=0.00,  # Cash has no unrealized gain/loss
-                brokers={self.broker_name: cash_amount}
-            )
-            
-            self.log.debug(f"Parsed cash holding: USD_CASH - ${cash_amount}")
-            return holding
-            
-        except Exception as e:
-            self.log.error(f"Error parsing cash position: {e}")
+    def _parse_cash_position(self, cash_amount: Optional[float]) -> Optional[Holding]:
+        """Build the cash holding from the value cell of the E*Trade cash row"""
+        if cash_amount is None or cash_amount <= 0:
             return None
 
-    async def _extract_positions_data_via_js(self) -> List[dict]:
-        script = r'''
-(() => {
-  const grid = document.querySelector('div[role="grid"][aria-label="Portfolios"]');
-  if (!grid) return [];
-
-  const extractText = (row, colIndex) => {
-    const cell = row.querySelector(`[aria-colindex="${colIndex}"]`);
-    if (!cell) return '';
-    return (cell.innerText || '').trim();
-  };
-
-  const rows = Array.from(grid.querySelectorAll('div[role="row"][aria-rowindex]'))
-    .filter(row => row.querySelector('[role="gridcell"]') || row.querySelector('[role="rowheader"]'));
-
-  const results = [];
-  for (const row of rows) {
-    const symbolCell = row.querySelector('[role="rowheader"][aria-colindex="1"]');
-    if (!symbolCell) continue;
-
-    // Check for cash row first by looking for the cash wrapper
-    const cashWrapper = symbolCell.querySelector('.FooterCellRenderer---cash-and-transfer-wrapper---ISxOD');
-    if (cashWrapper) {
-      // This is definitely the cash row - extract the cash value
-      const cashValue = extractText(row, 11);
-      if (cashValue) {
-        results.push({
-          symbol: 'Cash',
-          description: 'Cash & sweep funds',
-          value: cashValue
-        });
-        continue;
-      }
-    }
-
-    // Check for total row and skip it
-    const totalWrapper = symbolCell.querySelector('.FooterCellRenderer---cash-and-total---hAWG4');
-    if (totalWrapper && symbolCell.textContent.toLowerCase().includes('total')) {
-      continue; // Skip total row
-    }
-
-    // Regular stock rows
-    const symbolLink = symbolCell.querySelector('a');
-    const symbolText = symbolLink ? (symbolLink.textContent || '') : (symbolCell.textContent || '');
-    const symbol = symbolText.trim();
-    if (!symbol) continue;
-
-    const rawDescription = symbolLink ? (symbolLink.getAttribute('title') || symbolLink.getAttribute('aria-label') || '') : '';
-
-    results.push({
-      symbol,
-      description: rawDescription.trim(),
-      last_price: extractText(row, 3),
-      day_change_dollars: extractText(row, 4),
-      day_change_percent: extractText(row, 5),
-      quantity: extractText(row, 6),
-      cost_per_share: extractText(row, 7),
-      day_gain_dollars: extractText(row, 8),
-      total_gain: extractText(row, 9),
-      total_gain_percent: extractText(row, 10),
-      value: extractText(row, 11)
-    });
-  }
-
-  return results;
-})()
-        '''
-
-        result = await self.page.evaluate(script)
-        rows: List[dict] = []
-        if isinstance(result, list):
-            for entry in result:
-                if isinstance(entry, dict):
-                    rows.append(entry)
-
-        return rows
-
-    def _clean_decimal_text(self, value_str: str) -> float:
-        if not value_str:
-            raise ValueError("Value string cannot be empty")
-        value_str = value_str.strip()
-        is_negative = False
-        if '(' in value_str and ')' in value_str:
-            is_negative = True
-            value_str = value_str.replace('(', '').replace(')', '')
-        cleaned = re.sub(r'[,\$,%+]', '', value_str)
-        number_match = re.search(r'-?\d+\.?\d*', cleaned)
-        if not number_match:
-            raise ValueError(f"No valid number found in text: '{value_str}'")
-        result = float(number_match.group())
-        return -result if is_negative else result
-
-    def _clean_percentage_text(self, value_str: str) -> float:
-        if not value_str:
-            raise ValueError("Percentage string cannot be empty")
-        value_str = value_str.strip()
-        is_negative = False
-        if '(' in value_str and ')' in value_str:
-            is_negative = True
-            value_str = value_str.replace('(', '').replace(')', '')
-        cleaned = re.sub(r'[%+]', '', value_str)
-        number_match = re.search(r'-?\d+\.?\d*', cleaned)
-        if not number_match:
-            raise ValueError(f"No valid percentage found in text: '{value_str}'")
-        result = float(number_match.group()) / 100
-        return -result if is_negative else result
-
-    async def sanity_check(self, holdings: List[Holding]) -> None:
+        # Only the amount varies; everything else comes from the validated template
+        holding = self._CASH_TEMPLATE.model_copy(update={
+            "quantity": cash_amount,  # Cash quantity equals the dollar amount
+            "cost_basis": cash_amount,  # Cost basis equals current value for cash
+            "current_value": cash_amount,
+            "brokers": {self.broker_name: cash_amount},
+        })
+
+        self.log.debug("Parsed cash holding: USD_CASH - $%s", cash_amount)
+        return holding
+
+    async def _extract_positions_data_via_js(self) -> Tuple[List[tuple], Optional[dict]]:
+        """Return one fixed-order tuple per grid row (see ROW_FIELDS) and the totals row."""
+        result = await self.page.evaluate('window.__extractEtradePositions()')
+        rows: List[tuple] = []
+        totals = None
+        if isinstance(result, dict):
+            for entry in result.get('rows') or []:
+                if isinstance(entry, list) and len(entry) == len(ROW_FIELDS):
+                    rows.append(tuple(entry))
+            totals = result.get('totals')
+
+        return rows, totals
+
+    def sanity_check(self, computed_total_value: float, computed_unrealized_gain: float,
+                     totals: Optional[dict]) -> None:
         """Compare reported totals on the page with parsed holdings totals."""
         TOTAL_CHECK_TOLERANCE = 0.01
         
-        total_row_data = await self._parse_total_row()
-        if not total_row_data:
+        if not totals or any(totals.get(key) is None for key in
+                             ('total_value', 'market_value', 'unrealized_gain_loss')):
             raise RuntimeError("Could not find or parse totals row in E*TRADE portfolio")
 
-        reported_total_value = total_row_data['total_value']
-        reported_market_value = total_row_data['market_value']
-        reported_unrealized_gain = total_row_data['unrealized_gain_loss']
-
-        computed_total_value = sum(h.current_value for h in holdings)
-        computed_unrealized_gain = sum(h.unrealized_gain_loss for h in holdings)
+        reported_total_value = totals['total_value']
+        reported_unrealized_gain = totals['unrealized_gain_loss']
 
         # Check total value (should match reported total value)
         value_diff = abs(computed_total_value - reported_total_value)
@@ -406,62 +475,3 @@ class EtradeCrawler(BaseCrawler):
             computed_total_value,
             reported_total_value,
         )
-
-    async def _parse_total_row(self) -> dict:
-        """Parse the totals row from the E*TRADE portfolio table."""
-        script = r'''
-(() => {
-  const grid = document.querySelector('div[role="grid"][aria-label="Portfolios"]');
-  if (!grid) return null;
-
-  const extractText = (row, colIndex) => {
-    const cell = row.querySelector(`[aria-colindex="${colIndex}"]`);
-    if (!cell) return '';
-    return (cell.innerText || '').trim();
-  };
-
-  // Find the totals row by looking for the "Total" text (not "Cash Total")
-  const rows = Array.from(grid.querySelectorAll('div[role="row"][aria-rowindex]'));
-  for (const row of rows) {
-    const symbolCell = row.querySelector('[role="rowheader"][aria-colindex="1"]');
-    if (!symbolCell) continue;
-    
-    const totalWrapper = symbolCell.querySelector('.FooterCellRenderer---cash-and-total---hAWG4');
-    if (totalWrapper) {
-      const text = symbolCell.textContent.trim().toLowerCase();
-      // Match "Total" but not "Cash Total"
-      if (text === 'total' || (text.includes('total') && !text.includes('cash'))) {
-        // Found the totals row
-        return {
-          day_change: extractText(row, 8),      // Column 8: Day's Gain $
-          market_value: extractText(row, 7),    // Column 7: Total Cost (market value)
-          total_gain: extractText(row, 9),      // Column 9: Total Gain $
-          total_gain_percent: extractText(row, 10), // Column 10: Total Gain %
-          total_value: extractText(row, 11)     // Column 11: Value $
-        };
-      }
-    }
-  }
-  
-  return null;
-})()
-        '''
-        
-        try:
-            result = await self.page.evaluate(script)
-            if not result:
-                return None
-
-            # Parse the extracted values
-            total_value = self._clean_decimal_text(result['total_value'])
-            market_value = self._clean_decimal_text(result['market_value'])
-            unrealized_gain = self._clean_decimal_text(result['total_gain'])
-
-            return {
-                'total_value': total_value,
-                'market_value': market_value,
-                'unrealized_gain_loss': unrealized_gain,
-            }
-        except Exception as e:
-            self.log.error(f"Error parsing totals row: {e}")
-            return None
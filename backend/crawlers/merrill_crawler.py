@@ -1,8 +1,10 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, NamedTuple, Optional
 import asyncio
+from functools import lru_cache
 import re
-import random
-from bs4 import BeautifulSoup
+from collections import Counter
+from dataclasses import dataclass
+from bs4 import BeautifulSoup, SoupStrainer
 from playwright.async_api import async_playwright
 from datetime import datetime, timedelta
 
@@ -10,10 +12,101 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from crawlers.base_crawler import BaseCrawler
+from crawlers.base_crawler import BaseCrawler, debug_dump_enabled
 from models.portfolio import Holding
 
 
+# Holdings tables have a dynamic ID starting with CustomGrid_
+_HOLDINGS_TABLE_SELECTOR = 'table[id^="CustomGrid_"][class*="customTable"]'
+_HOLDINGS_ROW_SELECTOR = f'{_HOLDINGS_TABLE_SELECTOR} tbody tr'
+_USERNAME_SELECTOR = '#oid'
+_HOLDINGS_PATH = '/TFPHoldings/HoldingsByAccount.aspx'
+# Every holdings grid; used both to read the live page and to find the grids in saved HTML
+_GRID_TABLE_SELECTOR = 'table[id^="CustomGrid_"]'
+# Build the tree for the grids only; the rest of the page is skipped at parse time
+_GRID_ID_RE = re.compile(r'^CustomGrid_')
+_GRID_STRAINER = SoupStrainer('table', id=_GRID_ID_RE)
+
+# Number cleaning helpers: formatting characters go in one str.translate pass
+_DECIMAL_STRIP = str.maketrans('', '', '$,()')
+_PERCENT_STRIP = str.maketrans('', '', '%+()')
+_DECIMAL_RE = re.compile(r'[-+]?\d+\.?\d*')
+_PERCENT_RE = re.compile(r'-?\d+\.?\d*')
+_LEADING_NUMBER_RE = re.compile(r'^(\d+\.?\d*)')
+
+
+# Reads every holdings grid in the page into rows of cell records, mirroring what
+# _extract_table_rows gets from BeautifulSoup. Each cell comes back as
+# [text, spaced_text, link_text, dollar_text, percent_text]; a grid without a tbody is null.
+_EXTRACT_GRIDS_JS = r'''
+(tables) => {
+  const SKIPPED_TAGS = new Set(['SCRIPT', 'STYLE', 'TEMPLATE']);
+  // Non-empty trimmed text nodes in document order, like get_text(strip=True) iterates them
+  const textParts = (node, parts = []) => {
+    for (const child of node.childNodes) {
+      if (child.nodeType === 3) {
+        const text = child.data.trim();
+        if (text) parts.push(text);
+      } else if (child.nodeType === 1 && !SKIPPED_TAGS.has(child.tagName)) {
+        textParts(child, parts);
+      }
+    }
+    return parts;
+  };
+  const readCell = (td) => {
+    const parts = textParts(td);
+    const link = td.querySelector('a');
+    const dollar = td.querySelector('div.dol');
+    const percent = td.querySelector('div.per');
+    return [
+      parts.join(''),
+      parts.join(' '),
+      link ? textParts(link).join(' ') : null,
+      dollar ? textParts(dollar).join('') : null,
+      percent ? textParts(percent).join('') : null,
+    ];
+  };
+  return tables.map((table) => {
+    const tbody = table.querySelector('tbody');
+    if (!tbody) return null;
+    return Array.from(tbody.querySelectorAll('tr'), (tr) => Array.from(tr.querySelectorAll('td'), readCell));
+  });
+}
+'''
+
+
+class MerrillCell(NamedTuple):
+    """Text of one holdings-table cell, read in a single walk of its row"""
+    text: str  # get_text(strip=True)
+    spaced_text: str  # get_text(" ", strip=True)
+    link_text: Optional[str]  # text of the first <a>, None when the cell has no link
+    dollar_text: Optional[str]  # text of the nested div.dol, None when absent
+    percent_text: Optional[str]  # text of the nested div.per, None when absent
+
+
+@dataclass(slots=True)
+class _SymbolTotals:
+    """Running sums for one symbol while combining holdings"""
+    base_holding: Holding
+    count: int = 0
+    quantity: float = 0
+    cost_basis: float = 0
+    current_value: float = 0
+    day_change_dollars: float = 0
+    unrealized_gain_loss: float = 0
+    portfolio_percentage: Optional[float] = None
+
+    def add(self, holding: Holding):
+        self.count += 1
+        self.quantity += holding.quantity
+        self.cost_basis += holding.cost_basis
+        self.current_value += holding.current_value
+        self.day_change_dollars += holding.day_change_dollars
+        self.unrealized_gain_loss += holding.unrealized_gain_loss
+        if holding.portfolio_percentage is not None:
+            self.portfolio_percentage = (self.portfolio_percentage or 0) + holding.portfolio_percentage
+
+
 class MerrillCrawler(BaseCrawler):
     """Merrill Edge crawler"""
 
@@ -21,7 +114,7 @@ class MerrillCrawler(BaseCrawler):
     def __init__(self):
         super().__init__("merrill_edge")
         self.login_url = "https://olui2.fs.ml.com/login/signin.aspx"
-        self.portfolio_url = "https://olui2.fs.ml.com/TFPHoldings/HoldingsByAccount.aspx"
+        self.portfolio_url = f"https://olui2.fs.ml.com{_HOLDINGS_PATH}"
     
     def get_login_url(self) -> str:
         """Get Merrill login URL"""
@@ -33,26 +126,33 @@ class MerrillCrawler(BaseCrawler):
         
         
         # Navigate to the portfolio page that shows all holdings
-        if self.page.url != self.portfolio_url:
+        # Login leaves us on the holdings page (possibly with a query string), so only
+        # navigate when we are somewhere else
+        if _HOLDINGS_PATH not in self.page.url:
             self.log.info("Navigating to portfolio page...")
-            await self.page.goto(self.portfolio_url, wait_until='networkidle')
+            await self.page.goto(self.portfolio_url, wait_until='domcontentloaded')
         
-        # Wait for the portfolio table to load (it has a dynamic ID starting with CustomGrid_)
+        # Wait for the portfolio table rows to render (the table has a dynamic ID starting
+        # with CustomGrid_); this is the data we parse, so there is no need for networkidle
         self.log.info("Waiting for portfolio table to load...")
         try:
-            await self.page.wait_for_selector('table[id^="CustomGrid_"][class*="customTable"]', timeout=30000)
+            await self.page.wait_for_selector(_HOLDINGS_ROW_SELECTOR, timeout=30000)
             self.log.info("Portfolio table loaded successfully")
         except Exception as e:
-            self.log.warning(f"Portfolio table selector not found: {e}")
+            self.log.warning("Portfolio table selector not found: %s", e)
             # Continue anyway in case the table is there but with different attributes
         
-        # Get page HTML
-        html = await self.page.content()
-        
-        # Parse holdings from HTML
-        holdings = await self.parse_portfolio_html(html)
+        # Read the grid cells in the page; only their text crosses over CDP, no HTML is
+        # serialized or re-parsed in Python
+        grids = await self.page.eval_on_selector_all(_GRID_TABLE_SELECTOR, _EXTRACT_GRIDS_JS)
+        try:
+            holdings = self._parse_holdings_tables([self._to_cell_rows(grid) for grid in grids])
+        except Exception:
+            if debug_dump_enabled():
+                await self.dump_debug_html('holdings', await self.page.content())
+            raise
         
-        self.log.info(f"Found {len(holdings)} total holdings")
+        self.log.info("Found %d total holdings", len(holdings))
         
         return holdings
     
@@ -60,18 +160,24 @@ class MerrillCrawler(BaseCrawler):
         """Login to Merrill Edge"""
         self.log.info("Starting Merrill login...")
         
-        # First check if we're already logged in with a valid session
+        # First check if we're already logged in with a valid session. Going straight to the
+        # holdings page either renders the table or bounces to the sign-in form.
+        on_login_form = False
         try:
-            await self.page.goto(self.login_url, wait_until='domcontentloaded')
-            # Give the browser a chance to follow any automatic redirect
-            await self.page.wait_for_load_state('networkidle', timeout=15000)
+            await self.page.goto(self.portfolio_url, wait_until='domcontentloaded')
+            await self.page.wait_for_selector(
+                f"{_HOLDINGS_TABLE_SELECTOR}, {_USERNAME_SELECTOR}", timeout=15000
+            )
 
-            current_url = self.page.url
-            if "tfpholdings" in current_url.lower():
+            if await self.page.query_selector(_HOLDINGS_TABLE_SELECTOR):
                 self.log.info("Already logged in with stored session!")
                 return True
+            on_login_form = await self.page.query_selector(_USERNAME_SELECTOR) is not None
         except Exception:
             pass  # Continue with normal login if session check fails
+
+        if not on_login_form:
+            await self.page.goto(self.login_url, wait_until='domcontentloaded')
         
         # Get stored credentials
         credentials = self.get_credentials()
@@ -83,11 +189,11 @@ class MerrillCrawler(BaseCrawler):
         
         # Wait for page to fully load
         current_url = self.page.url
-        self.log.debug(f"Current URL: {current_url}")
+        self.log.debug("Current URL: %s", current_url)
         
         # Fill username field - crash if not found
         try:
-            await self.page.fill('#oid', username)
+            await self.page.fill(_USERNAME_SELECTOR, username)
             self.log.debug("Filled username field")
         except Exception as e:
             raise RuntimeError(f"Username field #oid not found: {e}") from e
@@ -101,7 +207,7 @@ class MerrillCrawler(BaseCrawler):
         
         # Click login button - crash if not found
         try:
-            await self.page.click('#secure-signin-submit', delay=random.randint(100, 200))
+            await self.page.click('#secure-signin-submit')
             self.log.debug("Clicked login button")
         except Exception as e:
             raise RuntimeError(f"Login button #secure-signin-submit not found: {e}") from e
@@ -109,9 +215,9 @@ class MerrillCrawler(BaseCrawler):
         # Wait for positions page or any portfolios page
         try:
             self.log.info("Waiting for positions page to load...")
-            await self.page.wait_for_url("**/TFPHoldings/HoldingsByAccount.aspx", timeout=5 * 60000)
+            await self.page.wait_for_url(f"**{_HOLDINGS_PATH}", timeout=5 * 60000)
         except Exception as e:
-            self.log.warning(f"Error waiting for positions URL: {e}")            
+            self.log.warning("Error waiting for positions URL: %s", e)            
         
         return True
     
@@ -121,128 +227,177 @@ class MerrillCrawler(BaseCrawler):
         return False
     
     async def parse_portfolio_html(self, html: str) -> List[Holding]:
-        """Parse Merrill Edge portfolio HTML to extract holdings"""
+        """Parse saved Merrill Edge portfolio HTML (e.g. a debug dump) to extract holdings"""
         self.log.info("Parsing HTML for all holdings...")
         
-        soup = self.parse_html_with_soup(html)
+        soup = self.parse_html_with_soup(html, parse_only=_GRID_STRAINER)
+        tables = soup.select(_GRID_TABLE_SELECTOR)
+        return self._parse_holdings_tables([self._extract_table_rows(table) for table in tables])
+
+    def _to_cell_rows(self, grid: Optional[List[List[List[Optional[str]]]]]) -> Optional[List[List[MerrillCell]]]:
+        """Wrap the rows returned by _EXTRACT_GRIDS_JS in cell records"""
+        if grid is None:
+            return None
+        return [[MerrillCell(*cell) for cell in row] for row in grid]
+
+    def _parse_holdings_tables(self, grids: List[Optional[List[List[MerrillCell]]]]) -> List[Holding]:
+        """Turn the cell rows of every holdings table into combined holdings"""
         holdings = []
-        
-        tables = soup.find_all('table', id=re.compile(r'^CustomGrid_'))
 
-        if not tables:
+        if not grids:
             raise RuntimeError("Merrill holdings tables not found")
 
-        self.log.info(f"Found {len(tables)} holdings table(s)")
+        self.log.info("Found %d holdings table(s)", len(grids))
 
-        for table in tables:
-            tbody = table.find('tbody')
-            if not tbody:
+        # Per-row outcomes are tallied and reported in one line after all tables are read
+        row_counts = Counter()
+        for rows in grids:
+            if rows is None:
                 continue
 
             table_holdings: List[Holding] = []
             pending_activity = 0.0
-            rows = tbody.find_all('tr')
+            total_row: Optional[List[MerrillCell]] = None
+            # Running sums for the sanity check, kept as rows are parsed
+            table_value = 0.0
+            table_unrealized = 0.0
             for row in rows:
-                first_cell = row.find('td')
-                if first_cell:
-                    symbol_preview = first_cell.get_text(strip=True).lower()
-                    if 'balances' in symbol_preview:
-                        self.log.info("Reached balances section, skipping this row")
-                        continue
-                
-                # Check if this is a pending activity row
-                try:
+                if not row:
+                    continue
+
+                # Classify the row from its first cell once, then run only the matching parser
+                first_cell = row[0]
+                label = first_cell.text.lower()
+                if 'balances' in label:
+                    row_counts['balance'] += 1
+                    continue
+
+                if 'pending activity' in label:
                     pending_value = self._parse_pending_activity_row(row)
                     if pending_value is not None:
                         pending_activity = pending_value
-                        self.log.info(f"Found pending activity: ${pending_activity}, this should be the last in current account table")
+                        self.log.info("Found pending activity: $%s, this should be the last in current account table", pending_activity)
                         break # This is always the last row
-                except Exception as e:
-                    self.log.debug(f"Row is not pending activity: {e}")
-                
-                # Check if this is a cash row (Money accounts)
-                try:
+                    continue
+
+                if label == 'total':
+                    # Kept for the sanity check instead of rescanning the table afterwards
+                    total_row = row
+                    continue
+
+                if first_cell.link_text and 'money accounts' in first_cell.link_text.lower():
                     cash_holding = self._parse_cash_row(row)
                     if cash_holding:
                         holdings.append(cash_holding)
                         table_holdings.append(cash_holding)
-                        self.log.info("Found and parsed cash position")
-                        continue  # Not necessarily the last row, the last row could be pending activity
-                except Exception as e:
-                    self.log.debug(f"Row is not a cash position: {e}")
-                
-                # This must be after parsing cash row and pending activity row
+                        table_value += cash_holding.current_value
+                        table_unrealized += cash_holding.unrealized_gain_loss
+                        row_counts['cash'] += 1
+                    continue  # Not necessarily the last row, the last row could be pending activity
+
                 try:
                     holding = self._parse_position_row(row)
                     if holding:
                         holdings.append(holding)
                         table_holdings.append(holding)
+                        table_value += holding.current_value
+                        table_unrealized += holding.unrealized_gain_loss
+                        row_counts['position'] += 1
+                    else:
+                        row_counts['skipped'] += 1
                 except Exception as e:
-                    self.log.error(f"Error parsing row: {e}")
+                    row_counts['error'] += 1
+                    self.log.error("Error parsing row: %s", e)
             
             # After loop: adjust cash holding if pending activity was found
             if pending_activity != 0.0:
                 for holding in table_holdings:
                     if holding.symbol == "USD_CASH":
-                        self.log.info(f"Adjusting cash balance: ${holding.current_value} + ${pending_activity} = ${holding.current_value + pending_activity}")
+                        self.log.info("Adjusting cash balance: $%s + $%s = $%s", holding.current_value, pending_activity, holding.current_value + pending_activity)
                         holding.quantity += pending_activity
                         holding.cost_basis += pending_activity
                         holding.current_value += pending_activity
                         holding.brokers[self.broker_name] = holding.current_value
+                        table_value += pending_activity
                         break
             
-            self.log.debug(f"found {len(table_holdings)} holdings from table")
-            self.sanity_check(table, table_holdings)
+            self.log.debug("found %d holdings from table", len(table_holdings))
+            if total_row is None:
+                # Only reached when the loop stopped at pending activity before the total row
+                total_row = self._find_total_row(rows)
+            self.sanity_check(total_row, table_value, table_unrealized)
 
         # Combine holdings by symbol
         combined_holdings = self._combine_holdings_by_symbol(holdings)
         
-        self.log.info(f"Successfully parsed {len(holdings)} individual holdings")
-        self.log.info(f"Combined into {len(combined_holdings)} unique symbols")
+        self.log.info(
+            "Rows: %d positions, %d cash, %d skipped, %d balance rows ignored, %d errors",
+            row_counts['position'], row_counts['cash'], row_counts['skipped'],
+            row_counts['balance'], row_counts['error'],
+        )
+        self.log.info("Successfully parsed %d individual holdings", len(holdings))
+        self.log.info("Combined into %d unique symbols", len(combined_holdings))
 
         return combined_holdings
     
-    def _parse_position_row(self, row) -> Holding:
+    def _extract_table_rows(self, table) -> Optional[List[List[MerrillCell]]]:
+        """Read every body row of a holdings table into cell records, or None without a tbody"""
+        tbody = table.find('tbody')
+        if not tbody:
+            return None
+        return [[self._read_cell(td) for td in tr.find_all('td')] for tr in tbody.find_all('tr')]
+
+    def _read_cell(self, td) -> MerrillCell:
+        link = td.find('a')
+        dollar_div = td.find('div', class_='dol')
+        percent_div = td.find('div', class_='per')
+        return MerrillCell(
+            text=td.get_text(strip=True),
+            spaced_text=td.get_text(" ", strip=True),
+            link_text=link.get_text(" ", strip=True) if link else None,
+            dollar_text=dollar_div.get_text(strip=True) if dollar_div else None,
+            percent_text=percent_div.get_text(strip=True) if percent_div else None,
+        )
+
+    def _parse_position_row(self, cells: List[MerrillCell]) -> Holding:
         """Parse a single position row from Merrill portfolio table"""
-        cells = row.find_all('td')
         if len(cells) < 11:
             return None
 
         try:
             symbol_cell = cells[0]
-            symbol_link = symbol_cell.find('a')
-            if symbol_link:
-                symbol = symbol_link.get_text(" ", strip=True).split()[0]
+            if symbol_cell.link_text is not None:
+                symbol = symbol_cell.link_text.split()[0]
             else:
-                symbol = symbol_cell.get_text(strip=True)
+                symbol = symbol_cell.text
             if symbol in ['Cash balance',]:
-                self.log.warning(f"skipping [{symbol}] row")
+                self.log.warning("skipping [%s] row", symbol)
                 return None
 
             if not symbol:
                 raise ValueError("Missing symbol")
 
-            description = cells[2].get_text(" ", strip=True)
+            description = cells[2].spaced_text
             if not description:
                 raise ValueError(f"Missing description for symbol {symbol}")
 
             day_change_dollars = self._extract_dollar_change(cells[3])
             day_change_percent = self._extract_percentage_change(cells[3])
 
-            price = self._clean_decimal_text(cells[4].get_text(" ", strip=True))
-            quantity = self._clean_decimal_text(cells[5].get_text(strip=True))
+            price = self._clean_decimal_text(cells[4].spaced_text)
+            quantity = self._clean_decimal_text(cells[5].text)
             if quantity == 0:
-                self.log.warning(f"Found position with zero quantity: {symbol}, maybe pending clearance.")
+                self.log.warning("Found position with zero quantity: %s, maybe pending clearance.", symbol)
                 return None
-            unit_cost = self._clean_decimal_text(cells[6].get_text(strip=True))
-            cost_basis = self._clean_decimal_text(cells[7].get_text(strip=True))
-            current_value = self._clean_decimal_text(cells[8].get_text(strip=True))
+            unit_cost = self._clean_decimal_text(cells[6].text)
+            cost_basis = self._clean_decimal_text(cells[7].text)
+            current_value = self._clean_decimal_text(cells[8].text)
 
             unrealized_gain_loss = self._extract_dollar_change(cells[9])
             unrealized_gain_loss_percent = self._extract_percentage_change(cells[9])
 
             portfolio_percentage = None
-            portfolio_text = cells[10].get_text(strip=True)
+            portfolio_text = cells[10].text
             if portfolio_text:
                 portfolio_percentage = self._clean_percentage_text(portfolio_text)
 
@@ -262,29 +417,22 @@ class MerrillCrawler(BaseCrawler):
                 brokers={self.broker_name: current_value}
             )
 
-            self.log.debug(f"Parsed holding: {symbol} - {quantity} @ ${price} (value ${current_value})")
+            self.log.debug("Parsed holding: %s - %s @ $%s (value $%s)", symbol, quantity, price, current_value)
             return holding
 
         except Exception as e:
-            self.log.error(f"Error parsing position row: {e}, symbol: {symbol}")
+            self.log.error("Error parsing position row: %s, symbol: %s", e, symbol)
             return None
 
-    def _parse_pending_activity_row(self, row) -> float:
+    def _parse_pending_activity_row(self, cells: List[MerrillCell]) -> float:
         """Parse a pending activity row and return the pending amount"""
-        cells = row.find_all('td')
         if len(cells) < 9:
             return None
         
         try:
-            # Check if this is a pending activity row
-            first_cell = cells[0]
-            text = first_cell.get_text(strip=True).lower()
-            if 'pending activity' not in text:
-                return None
-            
             # Extract the pending activity amount from the 9th cell (index 8)
             # This is the same column where current_value appears for regular positions
-            value_text = cells[8].get_text(strip=True)
+            value_text = cells[8].text
             if not value_text or value_text == '--':
                 return 0.0
             
@@ -292,34 +440,26 @@ class MerrillCrawler(BaseCrawler):
             return pending_amount
             
         except Exception as e:
-            self.log.debug(f"Error parsing pending activity row: {e}")
+            self.log.debug("Error parsing pending activity row: %s", e)
             return None
 
-    def _parse_cash_row(self, row) -> Holding:
+    def _parse_cash_row(self, cells: List[MerrillCell]) -> Holding:
         """Parse a cash position row from Merrill portfolio table"""
-        cells = row.find_all('td')
         if len(cells) < 9:
             return None
         
         try:
-            # Check if this is a cash row by looking for "Money accounts" link
-            first_cell = cells[0]
-            money_accounts_link = first_cell.find('a')
-            if not money_accounts_link or 'money accounts' not in money_accounts_link.get_text(strip=True).lower():
-                return None
-            
             # Extract description from the third cell (index 2)
-            description_cell = cells[2]
-            description = description_cell.get_text(strip=True) 
+            description = cells[2].text
             
             # Extract quantity from the sixth cell (index 5)
-            quantity_text = cells[5].get_text(strip=True)
+            quantity_text = cells[5].text
             if not quantity_text or quantity_text == '--':
                 return None
             quantity = self._clean_decimal_text(quantity_text)
             
             # Extract current value from the ninth cell (index 8) 
-            value_text = cells[8].get_text(strip=True)
+            value_text = cells[8].text
             if not value_text or value_text == '--':
                 return None
             current_value = self._clean_decimal_text(value_text)
@@ -340,36 +480,40 @@ class MerrillCrawler(BaseCrawler):
                 brokers={self.broker_name: current_value}
             )
             
-            self.log.debug(f"Parsed cash holding: USD_CASH - ${current_value}")
+            self.log.debug("Parsed cash holding: USD_CASH - $%s", current_value)
             return holding
             
         except Exception as e:
-            self.log.debug(f"Error parsing cash row: {e}")
+            self.log.debug("Error parsing cash row: %s", e)
             return None
 
-    def sanity_check(self, table, table_holdings: List[Holding]) -> bool:
+    def sanity_check(
+        self,
+        total_row_cells: Optional[List[MerrillCell]],
+        computed_total_value: float,
+        computed_unrealized_gain: float,
+    ) -> bool:
         """Compare reported totals within a single table against parsed holdings."""
         TOTAL_CHECK_TOLERANCE = 0.01
 
-        total_row = self._extract_total_row(table)
-        if total_row is None:
+        if total_row_cells is None:
             raise RuntimeError("Total row not found in Merrill holdings table")
+        total_row = self._parse_total_row(total_row_cells)
 
         reported_total_value = total_row['current_value']
         reported_unrealized_gain = total_row['unrealized_gain_loss']
 
-        computed_total_value = sum(holding.current_value for holding in table_holdings)
-        computed_unrealized_gain = sum(holding.unrealized_gain_loss for holding in table_holdings)
-
         value_diff = computed_total_value - reported_total_value
         unrealized_diff = computed_unrealized_gain - reported_unrealized_gain
 
-        if abs(value_diff) / reported_total_value > TOTAL_CHECK_TOLERANCE:
+        # Relative tolerance, falling back to an absolute one when the reported figure is
+        # zero (e.g. an empty account or a flat position)
+        if self._exceeds_tolerance(value_diff, reported_total_value, TOTAL_CHECK_TOLERANCE):
             raise RuntimeError(
                 f"Total value mismatch: holdings {computed_total_value} vs reported {reported_total_value}"
             )
 
-        if abs(unrealized_diff) / reported_unrealized_gain > TOTAL_CHECK_TOLERANCE:
+        if self._exceeds_tolerance(unrealized_diff, reported_unrealized_gain, TOTAL_CHECK_TOLERANCE):
             raise RuntimeError(
                 "Unrealized gain mismatch: holdings "
                 f"{computed_unrealized_gain} vs reported {reported_unrealized_gain}"
@@ -378,33 +522,33 @@ class MerrillCrawler(BaseCrawler):
 
         return True
 
-    def _extract_total_row(self, table) -> Dict[str, float] | None:
-        tbody = table.find('tbody')
-        if not tbody:
-            return None
+    @staticmethod
+    def _exceeds_tolerance(diff: float, reported: float, tolerance: float) -> bool:
+        if reported == 0:
+            return abs(diff) > tolerance
+        return abs(diff) / abs(reported) > tolerance
 
-        for row in tbody.find_all('tr'):
-            first_cell = row.find('td')
-            if not first_cell:
+    def _find_total_row(self, rows: List[List[MerrillCell]]) -> Optional[List[MerrillCell]]:
+        for cells in rows:
+            if not cells:
                 continue
 
-            if first_cell.get_text(strip=True).lower() == 'total':
-                return self._parse_total_row(row)
+            if cells[0].text.lower() == 'total':
+                return cells
 
         return None
 
-    def _parse_total_row(self, row) -> Dict[str, float]:
-        cells = row.find_all('td')
+    def _parse_total_row(self, cells: List[MerrillCell]) -> Dict[str, float]:
         if len(cells) < 10:
             raise RuntimeError("Total row missing expected cells")
 
-        total_value_text = cells[8].get_text(strip=True)
+        total_value_text = cells[8].text
         if not total_value_text or total_value_text == '--':
             raise RuntimeError("Total row missing total value")
         reported_total_value = self._clean_decimal_text(total_value_text)
 
         unrealized_cell = cells[9]
-        unrealized_text = unrealized_cell.get_text(strip=True)
+        unrealized_text = unrealized_cell.text
         if not unrealized_text or unrealized_text == '--':
             reported_unrealized_gain = 0.0
         else:
@@ -415,21 +559,21 @@ class MerrillCrawler(BaseCrawler):
             'unrealized_gain_loss': reported_unrealized_gain,
         }
 
-    def _extract_dollar_change(self, cell) -> float:
-        target = cell.find('div', class_=lambda value: value and 'dol' in value.split())
-        text = (target.get_text(strip=True) if target else cell.get_text(strip=True))
+    def _extract_dollar_change(self, cell: MerrillCell) -> float:
+        text = cell.dollar_text if cell.dollar_text is not None else cell.text
         if not text:
             return 0.0
         return self._clean_decimal_text(text)
 
-    def _extract_percentage_change(self, cell) -> float:
-        target = cell.find('div', class_=lambda value: value and 'per' in value.split())
-        text = (target.get_text(strip=True) if target else cell.get_text(strip=True))
+    def _extract_percentage_change(self, cell: MerrillCell) -> float:
+        text = cell.percent_text if cell.percent_text is not None else cell.text
         if not text:
             return 0.0
         return self._clean_percentage_text(text)
     
-    def _clean_decimal_text(self, value_str: str) -> float:
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _clean_decimal_text(value_str: str) -> float:
         """Clean text and extract decimal value, handling Merrill-specific formatting"""
         if not value_str:
             raise ValueError("Value string cannot be empty")
@@ -438,16 +582,13 @@ class MerrillCrawler(BaseCrawler):
         value_str = value_str.strip()
         
         # Handle negative values in parentheses
-        is_negative = False
-        if '(' in value_str and ')' in value_str:
-            is_negative = True
-            value_str = value_str.replace('(', '').replace(')', '')
+        is_negative = '(' in value_str and ')' in value_str
         
-        # Remove currency symbols, commas
-        cleaned = re.sub(r'[$,]', '', value_str)
+        # Remove currency symbols, commas and parentheses
+        cleaned = value_str.translate(_DECIMAL_STRIP)
         
         # Extract only the numeric part
-        number_match = re.search(r'[-+]?\d+\.?\d*', cleaned)
+        number_match = _DECIMAL_RE.search(cleaned)
         if number_match:
             number_str = number_match.group()
             try:
@@ -464,7 +605,7 @@ class MerrillCrawler(BaseCrawler):
             raise ValueError("Price text cannot be empty")
         
         # Look for the first decimal number at the beginning of the string
-        number_match = re.match(r'^(\d+\.?\d*)', price_text.strip())
+        number_match = _LEADING_NUMBER_RE.match(price_text.strip())
         if number_match:
             try:
                 return float(number_match.group(1))
@@ -473,7 +614,9 @@ class MerrillCrawler(BaseCrawler):
         
         raise ValueError(f"No valid price found at start of text: '{price_text}'")
     
-    def _clean_percentage_text(self, value_str: str) -> float:
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _clean_percentage_text(value_str: str) -> float:
         """Clean percentage text and convert to Decimal (as decimal, not percentage)"""
         if not value_str:
             raise ValueError("Percentage string cannot be empty")
@@ -481,22 +624,15 @@ class MerrillCrawler(BaseCrawler):
         # Remove whitespace
         value_str = value_str.strip()
         
-        # Handle negative values in parentheses or with "Loss of" prefix
-        is_negative = False
-        if '(' in value_str and ')' in value_str:
-            is_negative = True
-            value_str = value_str.replace('(', '').replace(')', '')
-        elif 'Loss of' in value_str:
-            is_negative = True
-            value_str = value_str.replace('Loss of', '').strip()
-        elif 'Gain of' in value_str:
-            value_str = value_str.replace('Gain of', '').strip()
+        # Handle negative values in parentheses or with "Loss of" prefix; a "Gain of"
+        # prefix needs no handling since the search below skips leading words
+        is_negative = ('(' in value_str and ')' in value_str) or 'Loss of' in value_str
         
         # Remove percentage symbol and other formatting
-        cleaned = re.sub(r'[%+]', '', value_str)
+        cleaned = value_str.translate(_PERCENT_STRIP)
         
         # Extract the numeric part
-        number_match = re.search(r'-?\d+\.?\d*', cleaned)
+        number_match = _PERCENT_RE.search(cleaned)
         if number_match:
             number_str = number_match.group()
             try:
@@ -512,31 +648,25 @@ class MerrillCrawler(BaseCrawler):
         if not holdings:
             return []
         
-        # Group holdings by symbol
-        symbol_groups = {}
+        # Accumulate per-symbol totals in a single pass over the holdings
+        symbol_totals: Dict[str, _SymbolTotals] = {}
         for holding in holdings:
-            symbol_groups.setdefault(holding.symbol, []).append(holding)
+            totals = symbol_totals.get(holding.symbol)
+            if totals is None:
+                # The first holding is the base for description and other metadata
+                totals = symbol_totals[holding.symbol] = _SymbolTotals(base_holding=holding)
+            totals.add(holding)
         
-        combined_holdings = []
-        for symbol, group in symbol_groups.items():
-            combined_holdings.append(self._combine_symbol_group(symbol, group))
-        
-        return combined_holdings
+        return [self._combine_symbol_group(symbol, totals) for symbol, totals in symbol_totals.items()]
     
-    def _combine_symbol_group(self, symbol: str, holdings: List[Holding]) -> Holding:
-        """Combine multiple holdings of the same symbol"""
-        if not holdings:
-            raise ValueError(f"No holdings provided for symbol {symbol}")
-        
-        # Use the first holding as the base for description and other metadata
-        base_holding = holdings[0]
-        
-        # Aggregate quantities and values
-        total_quantity = sum(h.quantity for h in holdings)
-        total_cost_basis = sum(h.cost_basis for h in holdings)
-        total_current_value = sum(h.current_value for h in holdings)
-        total_day_change_dollars = sum(h.day_change_dollars for h in holdings)
-        total_unrealized_gain_loss = sum(h.unrealized_gain_loss for h in holdings)
+    def _combine_symbol_group(self, symbol: str, totals: _SymbolTotals) -> Holding:
+        """Build the combined holding for one symbol from its accumulated totals"""
+        base_holding = totals.base_holding
+        total_quantity = totals.quantity
+        total_cost_basis = totals.cost_basis
+        total_current_value = totals.current_value
+        total_day_change_dollars = totals.day_change_dollars
+        total_unrealized_gain_loss = totals.unrealized_gain_loss
         
         # Calculate weighted averages and derived values
         if total_quantity != 0:
@@ -556,11 +686,8 @@ class MerrillCrawler(BaseCrawler):
         if total_cost_basis != 0:
             unrealized_gain_loss_percent = total_unrealized_gain_loss / total_cost_basis
         
-        # Sum portfolio percentages if available
-        portfolio_percentage = None
-        portfolio_percentages = [h.portfolio_percentage for h in holdings if h.portfolio_percentage is not None]
-        if portfolio_percentages:
-            portfolio_percentage = sum(portfolio_percentages)
+        # Sum of portfolio percentages, None when no holding reported one
+        portfolio_percentage = totals.portfolio_percentage
 
         combined_holding = Holding(
             symbol=symbol,
@@ -578,5 +705,5 @@ class MerrillCrawler(BaseCrawler):
             brokers={self.broker_name: total_current_value}
         )
         
-        self.log.debug(f"Combined {len(holdings)} holdings for {symbol}: {total_quantity} shares @ ${weighted_avg_price:.4f} = ${total_current_value}")
+        self.log.debug("Combined %d holdings for %s: %s shares @ $%.4f = $%s", totals.count, symbol, total_quantity, weighted_avg_price, total_current_value)
         return combined_holding
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import math
 from datetime import datetime
 from typing import Dict, Iterable, List, Sequence, Tuple, Type
 
@@ -9,13 +10,15 @@ from typing import Dict, Iterable, List, Sequence, Tuple, Type
 log = logging.getLogger(__name__)
 
 if __package__:
-    from .crawlers.base_crawler import BaseCrawler
+    from .async_runner import run
+    from .crawlers.base_crawler import BaseCrawler, browser_pool
     from .crawlers.chase_crawler import ChaseCrawler
     from .crawlers.etrade_crawler import EtradeCrawler
     from .crawlers.merrill_crawler import MerrillCrawler
     from .models.portfolio import CrawlerResult, Holding, Portfolio
 else:  # pragma: no cover - allows running as a script for quick tests
-    from crawlers.base_crawler import BaseCrawler
+    from async_runner import run
+    from crawlers.base_crawler import BaseCrawler, browser_pool
     from crawlers.chase_crawler import ChaseCrawler
     from crawlers.etrade_crawler import EtradeCrawler
     from crawlers.merrill_crawler import MerrillCrawler
@@ -30,7 +33,8 @@ BROKER_CRAWLERS: Sequence[CrawlerType] = (
 
 
 def _float_sum(values: Iterable[float]) -> float:
-    return sum(values, 0.0)
+    # fsum is exactly rounded, so totals don't drift with the number of holdings
+    return math.fsum(values)
 
 
 def _merge_broker_maps(holdings: Iterable[Holding]) -> Dict[str, float]:
@@ -48,11 +52,24 @@ def _combine_symbol_group(symbol: str, holdings: Sequence[Holding]) -> Holding:
 
     base = holdings[0]
 
-    total_quantity = _float_sum(h.quantity for h in holdings)
-    total_cost_basis = _float_sum(h.cost_basis for h in holdings)
-    total_current_value = _float_sum(h.current_value for h in holdings)
-    total_day_change_dollars = _float_sum(h.day_change_dollars for h in holdings)
-    total_unrealized_gain_loss = _float_sum(h.unrealized_gain_loss for h in holdings)
+    summed_fields = [
+        (h.quantity, h.cost_basis, h.current_value, h.day_change_dollars, h.unrealized_gain_loss)
+        for h in holdings
+    ]
+    if len(summed_fields) == 1:
+        # Most symbols are held at a single broker, whose fields already are the totals
+        totals = summed_fields[0]
+    else:
+        # Transpose the group into one column per summed field, so each total is a
+        # C-level sum over a tuple rather than its own generator over the models
+        totals = tuple(_float_sum(column) for column in zip(*summed_fields))
+    (
+        total_quantity,
+        total_cost_basis,
+        total_current_value,
+        total_day_change_dollars,
+        total_unrealized_gain_loss,
+    ) = totals
 
     weighted_price = 0.0
     weighted_unit_cost = 0.0
@@ -107,40 +124,57 @@ def _assign_portfolio_percentages(holdings: List[Holding]) -> List[Holding]:
     if total_value == 0:
         return holdings
 
-    updated: List[Holding] = []
+    # The combined holdings are built fresh for this run, so set the field in place
+    # rather than copying every model
     for holding in holdings:
-        percentage = holding.current_value / total_value
-        updated.append(holding.copy(update={"portfolio_percentage": percentage}))
-    return updated
+        holding.portfolio_percentage = holding.current_value / total_value
+    return holdings
 
 
 async def _run_crawler(crawler_cls: CrawlerType) -> CrawlerResult:
     crawler = crawler_cls()
-    async with crawler:
-        return await crawler.crawl()
+    try:
+        async with crawler:
+            return await crawler.crawl()
+    except Exception as exc:
+        raise RuntimeError(f"Error running crawler {crawler_cls}: {exc}") from exc
 
 
 async def fetch_all_positions() -> Portfolio:
-    results: List[CrawlerResult] = []
-    for crawler_cls in BROKER_CRAWLERS:
-        try:
-            result = await _run_crawler(crawler_cls)
-            results.append(result)
-        except Exception as exc:
-            raise RuntimeError(f"Error running crawler {crawler_cls}: {exc}") from exc
-            
+    # Brokers are independent sites, so crawl them concurrently, each in its own tab of
+    # one automation Chrome that stays warm for the whole run
+    async with browser_pool:
+        # return_exceptions lets the other brokers finish (and release their tabs) when one
+        # fails; the failure is still raised once they are done
+        outcomes = await asyncio.gather(
+            *(_run_crawler(crawler_cls) for crawler_cls in BROKER_CRAWLERS),
+            return_exceptions=True,
+        )
+
+    failures = [outcome for outcome in outcomes if isinstance(outcome, BaseException)]
+    for failure in failures:
+        log.error("%s", failure)
+    if failures:
+        raise failures[0]
+    results: List[CrawlerResult] = list(outcomes)
+
     combined_holdings = _combine_successful_holdings(results)
     holdings_with_percentages = _assign_portfolio_percentages(combined_holdings)
 
-    total_value = _float_sum(h.current_value for h in holdings_with_percentages)
-    total_cost_basis = _float_sum(h.cost_basis for h in holdings_with_percentages)
-    total_unrealized = _float_sum(h.unrealized_gain_loss for h in holdings_with_percentages)
+    # One pass over the holdings gathers every column the totals need
+    values, cost_bases, unrealized_gains, day_changes = tuple(zip(*(
+        (h.current_value, h.cost_basis, h.unrealized_gain_loss, h.day_change_dollars)
+        for h in holdings_with_percentages
+    ))) or ((), (), (), ())
+    total_value = _float_sum(values)
+    total_cost_basis = _float_sum(cost_bases)
+    total_unrealized = _float_sum(unrealized_gains)
 
     total_unrealized_percent = 0.0
     if total_cost_basis != 0:
         total_unrealized_percent = total_unrealized / total_cost_basis
 
-    total_day_change_dollars = _float_sum(h.day_change_dollars for h in holdings_with_percentages)
+    total_day_change_dollars = _float_sum(day_changes)
 
     total_day_change_percent = 0.0
     prior_value = total_value - total_day_change_dollars
@@ -160,9 +194,9 @@ async def fetch_all_positions() -> Portfolio:
 
     for result in results:
         status = "SUCCESS" if result.success else "FAILED"
-        log.info(f"[{result.broker}] {status} - holdings: {len(result.holdings)}")
+        log.info("[%s] %s - holdings: %d", result.broker, status, len(result.holdings))
         if result.error_message:
-            log.error(f"    Error: {result.error_message}")    
+            log.error("    Error: %s", result.error_message)
 
     return portfolio
 
@@ -170,15 +204,20 @@ async def fetch_all_positions() -> Portfolio:
 async def main() -> None:
     portfolio = await fetch_all_positions()
 
-    log.info("\nCombined Holdings:")
-    for holding in portfolio.holdings:
-        broker_details = ", ".join(
-            f"{broker}: ${value}" for broker, value in sorted(holding.brokers.items())
-        ) or "(none)"
-        log.info(
-            f"- {holding.symbol}: qty={holding.quantity}, value=${holding.current_value}"
-            f" ({broker_details})"
-        )
+    # The per-holding broker breakdown is only worth building when INFO is emitted
+    if log.isEnabledFor(logging.INFO):
+        log.info("\nCombined Holdings:")
+        for holding in portfolio.holdings:
+            broker_details = ", ".join(
+                f"{broker}: ${value}" for broker, value in sorted(holding.brokers.items())
+            ) or "(none)"
+            log.info(
+                "- %s: qty=%s, value=$%s (%s)",
+                holding.symbol,
+                holding.quantity,
+                holding.current_value,
+                broker_details,
+            )
 
     print("\nPortfolio Totals:")
     print(f"  Total Value: ${portfolio.total_value}")
@@ -198,4 +237,4 @@ async def main() -> None:
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    run(main)
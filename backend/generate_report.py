@@ -1,16 +1,26 @@
 #!/usr/bin/env python3
 import sqlite3
-import pandas as pd
-import plotly.express as px
-import plotly.io as pio
 import os
 import sys
+import json
 from datetime import datetime
+from importlib.metadata import version
 
 # Define paths
-DB_PATH = "/Users/jluan/code/portfolio/portfolio.db"
+DB_PATH = os.environ.get(
+    "PORTFOLIO_DB",
+    os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "portfolio.db")),
+)
 OUTPUT_DIR = "/Users/jluan/code/portfolio/frontend"
 OUTPUT_FILE = os.path.join(OUTPUT_DIR, "index.html")
+CHART_CACHE_FILE = os.path.join(os.path.dirname(DB_PATH), "chart_cache.json")
+
+# Snapshots for a date are replaced when the fetch is re-run that day, so the key covers
+# the charted values as well as the row count and latest date
+HISTORY_KEY_QUERY = "SELECT COUNT(*), MAX(date), SUM(total_value), SUM(total_cost_basis) FROM portfolio_snapshots"
+
+# Bump whenever the px.line / update_layout chart code changes, so cached charts are rebuilt
+CHART_VERSION = 1
 
 def fmt_money(val):
     if val is None: return "$0.00"
@@ -24,7 +34,30 @@ def get_color_class(val):
     if val is None: return ""
     return "text-success" if val >= 0 else "text-danger"
 
+def load_cached_chart(key):
+    try:
+        with open(CHART_CACHE_FILE) as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if cached.get("key") != key:
+        return None
+    return cached.get("html")
+
+def save_cached_chart(key, html):
+    tmp_path = CHART_CACHE_FILE + ".tmp"
+    try:
+        with open(tmp_path, "w") as f:
+            json.dump({"key": key, "html": html}, f)
+        os.replace(tmp_path, CHART_CACHE_FILE)
+    except OSError as e:
+        print(f"Could not write chart cache: {e}")
+
 def generate_report():
+    # pandas and plotly are imported here rather than at module load; plotly is only
+    # needed when the chart has to be re-rendered
+    import pandas as pd
+
     print(f"Connecting to database at {DB_PATH}...")
     try:
         conn = sqlite3.connect(DB_PATH)
@@ -36,12 +69,26 @@ def generate_report():
     chart_html = ""
     try:
         print("Fetching historical data...")
-        df_history = pd.read_sql_query("SELECT date, total_value, total_cost_basis FROM portfolio_snapshots ORDER BY date", conn)
+        # The plotly version is read from package metadata, which does not import plotly itself
+        history_key = "|".join(
+            str(v)
+            for v in (CHART_VERSION, version("plotly"), *conn.execute(HISTORY_KEY_QUERY).fetchone())
+        )
+        cached_chart = load_cached_chart(history_key)
+        df_history = None
+        if cached_chart is None:
+            df_history = pd.read_sql_query("SELECT date, total_value, total_cost_basis FROM portfolio_snapshots ORDER BY date", conn)
         
-        if df_history.empty:
+        if cached_chart is not None:
+            print("History unchanged, reusing cached chart.")
+            chart_html = cached_chart
+        elif df_history.empty:
             print("No historical data found.")
             chart_html = "<div class='alert alert-info'>No historical data available yet.</div>"
         else:
+            import plotly.express as px
+            import plotly.io as pio
+
             # Create Plotly Chart
             fig = px.line(df_history, x='date', y=['total_value', 'total_cost_basis'], 
                           title='Portfolio Value History',
@@ -61,6 +108,7 @@ def generate_report():
             )
             
             chart_html = pio.to_html(fig, full_html=False, include_plotlyjs='cdn')
+            save_cached_chart(history_key, chart_html)
             
     except Exception as e:
         print(f"Error generating chart: {e}")
@@ -69,21 +117,17 @@ def generate_report():
     # 2. Fetch Latest Snapshot
     try:
         print("Fetching latest snapshot...")
-        cursor = conn.cursor()
-        cursor.execute("SELECT date FROM portfolio_snapshots ORDER BY date DESC LIMIT 1")
-        result = cursor.fetchone()
+        # The latest summary row carries its own date, so one query finds both
+        df_summary = pd.read_sql_query("SELECT * FROM portfolio_snapshots ORDER BY date DESC LIMIT 1", conn)
         
-        if not result:
+        if df_summary.empty:
             print("No snapshots found in database.")
             conn.close()
             return
             
-        latest_date = result[0]
-        print(f"Latest date: {latest_date}")
-        
-        # Fetch Portfolio Summary
-        df_summary = pd.read_sql_query("SELECT * FROM portfolio_snapshots WHERE date = ?", conn, params=(latest_date,))
         summary_row = df_summary.iloc[0]
+        latest_date = summary_row['date']
+        print(f"Latest date: {latest_date}")
         
         # Fetch Holdings
         df_holdings = pd.read_sql_query("SELECT * FROM holdings_snapshots WHERE date = ? ORDER BY current_value DESC", conn, params=(latest_date,))
@@ -101,29 +145,31 @@ def generate_report():
     summary_day_change_cls = get_color_class(summary_row['day_change_dollars'])
     summary_unrealized_cls = get_color_class(summary_row['total_unrealized_gain_loss'])
     
-    holdings_rows = ""
-    for _, row in df_holdings.iterrows():
-        day_change_cls = get_color_class(row['day_change_dollars'])
-        unrealized_cls = get_color_class(row['unrealized_gain_loss'])
+    # itertuples avoids building a Series per row, and the rows are joined once at the end
+    holdings_row_parts = []
+    for row in df_holdings.itertuples(index=False):
+        day_change_cls = get_color_class(row.day_change_dollars)
+        unrealized_cls = get_color_class(row.unrealized_gain_loss)
         
-        holdings_rows += f"""
+        holdings_row_parts.append(f"""
         <tr>
-            <td class="fw-bold">{row['symbol']}</td>
-            <td><small class="text-muted">{row['description']}</small></td>
-            <td class="text-end">{row['quantity']:.4f}</td>
-            <td class="text-end">{fmt_money(row['price'])}</td>
-            <td class="text-end fw-bold">{fmt_money(row['current_value'])}</td>
+            <td class="fw-bold">{row.symbol}</td>
+            <td><small class="text-muted">{row.description}</small></td>
+            <td class="text-end">{row.quantity:.4f}</td>
+            <td class="text-end">{fmt_money(row.price)}</td>
+            <td class="text-end fw-bold">{fmt_money(row.current_value)}</td>
             <td class="text-end {day_change_cls}">
-                {fmt_money(row['day_change_dollars'])}
-                <br><small>{fmt_pct(row['day_change_percent'])}</small>
+                {fmt_money(row.day_change_dollars)}
+                <br><small>{fmt_pct(row.day_change_percent)}</small>
             </td>
             <td class="text-end {unrealized_cls}">
-                {fmt_money(row['unrealized_gain_loss'])}
-                <br><small>{fmt_pct(row['unrealized_gain_loss_percent'])}</small>
+                {fmt_money(row.unrealized_gain_loss)}
+                <br><small>{fmt_pct(row.unrealized_gain_loss_percent)}</small>
             </td>
-            <td class="text-end">{fmt_pct(row['portfolio_percentage'])}</td>
+            <td class="text-end">{fmt_pct(row.portfolio_percentage)}</td>
         </tr>
-        """
+        """)
+    holdings_rows = "".join(holdings_row_parts)
 
     html_content = f"""
 <!DOCTYPE html>
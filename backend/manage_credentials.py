@@ -31,8 +31,8 @@ def add_credentials():
         return False
     
     # Store credentials
-    db = DatabaseManager()
-    db.store_credentials(broker, username, password)
+    with DatabaseManager() as db:
+        db.store_credentials(broker, username, password)
     
     print(f"\n✅ Credentials stored for {broker}")
     
@@ -44,19 +44,17 @@ def list_credentials():
     print("Stored Broker Credentials")
     print("=" * 28)
     
-    db = DatabaseManager()
-    brokers = db.list_brokers()
+    with DatabaseManager() as db:
+        credentials = db.list_all_credentials()
     
-    if not brokers:
+    if not credentials:
         print("No credentials stored yet.")
         return
     
-    for broker in brokers:
-        creds = db.get_credentials(broker)
-        if creds:
-            print(f"\n📊 {broker}")
-            print(f"   Username: {creds['username']}")
-            print(f"   Password: {creds['password']}")
+    for broker, username, password in credentials:
+        print(f"\n📊 {broker}")
+        print(f"   Username: {username}")
+        print(f"   Password: {password}")
 
 
 def delete_credentials():
@@ -64,8 +62,8 @@ def delete_credentials():
     print("Delete Broker Credentials")
     print("=" * 28)
     
-    db = DatabaseManager()
-    brokers = db.list_brokers()
+    with DatabaseManager() as db:
+        brokers = db.list_brokers()
     
     if not brokers:
         print("No credentials stored yet.")
@@ -82,12 +80,8 @@ def delete_credentials():
             confirm = input(f"Delete credentials for '{broker}'? (y/N): ").strip().lower()
             
             if confirm == 'y':
-                # Delete from database (we need to add this method)
-                import sqlite3
-                with sqlite3.connect(db.db_path) as conn:
-                    conn.execute("DELETE FROM credentials WHERE broker = ?", (broker,))
-                    conn.execute("DELETE FROM sessions WHERE broker = ?", (broker,))
-                    conn.commit()
+                with DatabaseManager() as db:
+                    db.delete_credentials(broker)
                 
                 print(f"✅ Deleted credentials for {broker}")
                 return True
@@ -35,14 +35,18 @@ class Portfolio(BaseModel):
     day_change_dollars: float
 
     def to_dataframe(self) -> pd.DataFrame:
-        rows: List[Dict[str, object]] = []
-        for holding in self.holdings:
-            row = holding.model_dump()
-            brokers_mapping = row.get("brokers", {}) or {}
-            row["brokers"] = json.dumps(brokers_mapping, sort_keys=True)
-            rows.append(row)
-
-        return pd.DataFrame(rows)
+        # Gather one list per field rather than model_dump()ing every holding into a row dict
+        holdings = self.holdings
+        columns: Dict[str, List[object]] = {
+            name: [getattr(holding, name) for holding in holdings]
+            for name in Holding.model_fields
+            if name != "brokers"
+        }
+        columns["brokers"] = [
+            json.dumps(holding.brokers or {}, sort_keys=True) for holding in holdings
+        ]
+
+        return pd.DataFrame(columns)
 
 
 class CrawlerResult(BaseModel):
@@ -3,7 +3,6 @@
 Test script for Chase crawler
 """
 
-import asyncio
 import sys
 import os
 import logging
@@ -11,7 +10,7 @@ import logging
 # Add the backend directory to Python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from crawlers.chase_crawler import ChaseCrawler
+from async_runner import run
 from storage.database import DatabaseManager
 
 # Set up logging
@@ -24,35 +23,43 @@ async def run_chase_crawler():
     print("=== Running Chase Crawler ===")
     
     # Check if credentials exist
-    db = DatabaseManager()
-    creds = db.get_credentials("chase")
+    with DatabaseManager() as db:
+        creds = db.get_credentials("chase")
     
     if not creds:
         print("❌ No Chase credentials found!")
         print("Please run: python add_chase_credentials.py")
         raise RuntimeError("No Chase credentials found!")
     
-    log.info(f"Found credentials for user: {creds['username']}")
+    log.info("Found credentials for user: %s", creds['username'])
     print(f"✅ Found credentials for user: {creds['username']}")
     
+    # Imported only once credentials are confirmed, so that early exit skips loading Playwright
+    from crawlers.chase_crawler import ChaseCrawler
+
     # Test crawler with visible browser window
     async with ChaseCrawler() as crawler:
         log.info("Starting Chase crawl...")
         print("\n🚀 Starting Chase crawl...")
         result = await crawler.crawl()
         
-        log.info(f"Crawl Results: Success={result.success}, Broker={result.broker}, Holdings={len(result.holdings)}")
+        log.info(
+            "Crawl Results: Success=%s, Broker=%s, Holdings=%d",
+            result.success,
+            result.broker,
+            len(result.holdings),
+        )
         print(f"\n📊 Crawl Results:")
         print(f"  Success: {result.success}")
         print(f"  Broker: {result.broker}")
         print(f"  Holdings Count: {len(result.holdings)}")
         
         if result.error_message:
-            log.error(f"Crawl error: {result.error_message}")
+            log.error("Crawl error: %s", result.error_message)
             print(f"  Error: {result.error_message}")
         
         if result.requires_2fa:
-            log.info(f"2FA Required: {result.requires_2fa}")
+            log.info("2FA Required: %s", result.requires_2fa)
             print(f"  2FA Required: {result.requires_2fa}")
         
         if result.holdings:
@@ -93,5 +100,5 @@ async def main():
 
 
 if __name__ == "__main__":
-    exit_code = asyncio.run(main())
+    exit_code = run(main)
     sys.exit(exit_code)
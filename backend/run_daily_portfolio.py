@@ -1,17 +1,17 @@
 #!/usr/bin/env python3
-import asyncio
 import logging
 import sys
 import argparse
 from datetime import datetime, date
+from functools import lru_cache
 
-# Add the parent directory to sys.path to allow imports
+# Add the backend directory to Python path. Importing through the same top-level names as
+# the crawlers keeps a single copy of each module (and of the shared browser pool) loaded.
 import os
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-import pandas_market_calendars as mcal
-from backend.fetch_all_positions import fetch_all_positions
-from backend.storage.database import DatabaseManager
+from async_runner import run
+from storage.database import DatabaseManager
 
 # Configure logging
 logging.basicConfig(
@@ -24,11 +24,19 @@ logging.basicConfig(
 )
 log = logging.getLogger("daily_portfolio_run")
 
+@lru_cache(maxsize=4)
+def _nyse_trading_days(year: int) -> frozenset:
+    """All NYSE trading days in the given year"""
+    # Imported here so --always runs never load pandas_market_calendars
+    import pandas_market_calendars as mcal
+
+    nyse = mcal.get_calendar('NYSE')
+    valid_days = nyse.valid_days(start_date=f"{year}-01-01", end_date=f"{year}-12-31")
+    return frozenset(valid_days.date)
+
 def is_trading_day(check_date: date) -> bool:
     """Check if the given date is a trading day for NYSE"""
-    nyse = mcal.get_calendar('NYSE')
-    schedule = nyse.schedule(start_date=check_date, end_date=check_date)
-    return not schedule.empty
+    return check_date in _nyse_trading_days(check_date.year)
 
 async def main():
     parser = argparse.ArgumentParser(description="Run daily portfolio fetch.")
@@ -42,6 +50,9 @@ async def main():
             log.info(f"Today {today} is not a trading day (Weekend or Holiday). Skipping run. Use --always to force run.")
             return
 
+    # Imported after the trading-day check so skipped days never load the crawlers and Playwright
+    from fetch_all_positions import fetch_all_positions
+
     log.info("Starting daily portfolio fetch...")
     try:
         # 1. Fetch positions
@@ -49,8 +60,8 @@ async def main():
         log.info(f"Successfully fetched portfolio. Total Value: ${portfolio.total_value:,.2f}")
         
         # 2. Save to database
-        db_manager = DatabaseManager()
-        snapshot_date = db_manager.save_portfolio_snapshot(portfolio)
+        with DatabaseManager() as db_manager:
+            snapshot_date = db_manager.save_portfolio_snapshot(portfolio)
         log.info(f"Saved portfolio snapshot to database for date: {snapshot_date}")
         
     except Exception as e:
@@ -58,4 +69,4 @@ async def main():
         sys.exit(1)
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    run(main)
@@ -3,14 +3,13 @@
 Run E*TRADE crawler
 """
 
-import asyncio
 import sys
 import os
 
 # Add the backend directory to Python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from crawlers.etrade_crawler import EtradeCrawler
+from async_runner import run
 from storage.database import DatabaseManager
 
 
@@ -19,8 +18,8 @@ async def run_etrade_crawler():
     print("=== Running E*TRADE Crawler ===")
 
     # Check if credentials exist
-    db = DatabaseManager()
-    creds = db.get_credentials("etrade")
+    with DatabaseManager() as db:
+        creds = db.get_credentials("etrade")
 
     if not creds:
         print("❌ No E*TRADE credentials found!")
@@ -29,6 +28,9 @@ async def run_etrade_crawler():
 
     print(f"✅ Found credentials for user: {creds['username']}")
 
+    # Imported only once credentials are confirmed, so that early exit skips loading Playwright
+    from crawlers.etrade_crawler import EtradeCrawler
+
     # Use visible browser for interactive login (and to complete 2FA if required)
     async with EtradeCrawler() as crawler:
         print("\n🚀 Starting E*TRADE crawl...")
@@ -80,5 +82,5 @@ async def main():
 
 
 if __name__ == "__main__":
-    exit_code = asyncio.run(main())
+    exit_code = run(main)
     sys.exit(exit_code)
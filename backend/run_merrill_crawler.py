@@ -3,14 +3,13 @@
 Run Merrill Edge crawler
 """
 
-import asyncio
 import sys
 import os
 
 # Add the backend directory to Python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from crawlers.merrill_crawler import MerrillCrawler
+from async_runner import run
 from storage.database import DatabaseManager
 
 
@@ -19,8 +18,8 @@ async def run_merrill_crawler():
     print("=== Running Merrill Crawler ===")
     
     # Check if credentials exist
-    db = DatabaseManager()
-    creds = db.get_credentials("merrill_edge")
+    with DatabaseManager() as db:
+        creds = db.get_credentials("merrill_edge")
     
     if not creds:
         print("❌ No Merrill credentials found!")
@@ -29,6 +28,9 @@ async def run_merrill_crawler():
     
     print(f"✅ Found credentials for user: {creds['username']}")
     
+    # Imported only once credentials are confirmed, so that early exit skips loading Playwright
+    from crawlers.merrill_crawler import MerrillCrawler
+
     # Test crawler with visible browser window
     async with MerrillCrawler() as crawler:
         print("\n🚀 Starting Merrill crawl...")
@@ -80,4 +82,4 @@ async def main():
 
 
 if __name__ == "__main__":
-    exit_code = asyncio.run(main())
+    exit_code = run(main)
@@ -3,20 +3,19 @@
 CLI tool for testing the crawler infrastructure
 """
 
-import asyncio
 import sys
+from functools import partial
 from typing import Dict, Any
 
 from crawlers.sandbox_crawler import SandboxCrawler
+from async_runner import run
 from storage.database import DatabaseManager
 
 
-async def test_credentials():
+async def test_credentials(db: DatabaseManager):
     """Test credential storage and retrieval"""
     print("=== Testing Credential Storage ===")
     
-    db = DatabaseManager()
-    
     # Store test credentials
     db.store_credentials(
         broker="test_broker",
@@ -60,12 +59,10 @@ async def test_crawler():
     return result.success
 
 
-async def test_session_storage():
+async def test_session_storage(db: DatabaseManager):
     """Test session storage functionality"""
     print("\n=== Testing Session Storage ===")
     
-    db = DatabaseManager()
-    
     # Store test session (proper Playwright storage state format)
     test_session = {
         "cookies": [
@@ -106,23 +103,25 @@ async def main():
     print("Portfolio Crawler Infrastructure Test")
     print("=" * 40)
     
-    tests = [
-        ("Credentials", test_credentials),
-        ("Session Storage", test_session_storage),
-        ("Crawler", test_crawler)
-    ]
+    # One manager for the storage tests: a single schema check, key load and connection
+    with DatabaseManager() as db:
+        tests = [
+            ("Credentials", partial(test_credentials, db)),
+            ("Session Storage", partial(test_session_storage, db)),
+            ("Crawler", test_crawler)
+        ]
     
-    results = {}
+        results = {}
     
-    for test_name, test_func in tests:
-        try:
-            result = await test_func()
-            results[test_name] = result
-            status = "✅ PASS" if result else "❌ FAIL"
-            print(f"\n{test_name}: {status}")
-        except Exception as e:
-            results[test_name] = False
-            print(f"\n{test_name}: ❌ ERROR - {e}")
+        for test_name, test_func in tests:
+            try:
+                result = await test_func()
+                results[test_name] = result
+                status = "✅ PASS" if result else "❌ FAIL"
+                print(f"\n{test_name}: {status}")
+            except Exception as e:
+                results[test_name] = False
+                print(f"\n{test_name}: ❌ ERROR - {e}")
     
     print("\n" + "=" * 40)
     print("Test Summary:")
@@ -137,5 +136,5 @@ async def main():
 
 
 if __name__ == "__main__":
-    exit_code = asyncio.run(main())
+    exit_code = run(main)
     sys.exit(exit_code)
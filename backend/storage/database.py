@@ -1,29 +1,67 @@
 import sqlite3
 import json
 import base64
-from typing import Optional, Dict, Any
+import threading
+from typing import Optional, Dict, Any, List, Tuple
 from cryptography.fernet import Fernet
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 import os
 
 
+# Resolved once at import: $PORTFOLIO_DB if set, otherwise portfolio.db at the project root
+DEFAULT_DB_PATH = os.environ.get(
+    "PORTFOLIO_DB",
+    os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "portfolio.db")),
+)
+
+# Key bytes by absolute key-file path, and Fernet instances by key, so constructing another
+# DatabaseManager in the same process skips the key-file read and the cipher setup
+_KEY_CACHE: Dict[str, bytes] = {}
+_CIPHER_CACHE: Dict[bytes, Fernet] = {}
+
+# Every Fernet token starts with the version byte 0x80 and a timestamp, which encode to this
+_FERNET_TOKEN_PREFIX = b"gAAAAA"
+
+
+def _get_cipher(key: bytes) -> Fernet:
+    cipher = _CIPHER_CACHE.get(key)
+    if cipher is None:
+        cipher = _CIPHER_CACHE[key] = Fernet(key)
+    return cipher
+
+
 class DatabaseManager:
     """Manages SQLite database for credentials and encrypted sessions"""
     
-    def __init__(self, db_path: str = "/Users/jluan/code/portfolio/portfolio.db"):
+    def __init__(self, db_path: str = DEFAULT_DB_PATH):
         self.db_path = db_path
         self.encryption_key = self._get_or_create_encryption_key()
-        self.cipher_suite = Fernet(self.encryption_key)
+        self.cipher_suite = _get_cipher(self.encryption_key)
+        # One connection serves every call on this manager; check_same_thread is off because
+        # crawlers read credentials from worker threads via asyncio.to_thread. The lock keeps one
+        # thread's `with self._conn` from committing or rolling back another thread's transaction;
+        # it is reentrant because get_session clears invalid sessions while holding it.
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._lock = threading.RLock()
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA temp_store=MEMORY")
+        self._conn.execute("PRAGMA cache_size=-20000")
         self._init_database()
     
     def _get_or_create_encryption_key(self) -> bytes:
         """Generate or load encryption key for session data"""
         key_file = "encryption.key"
+        key_path = os.path.abspath(key_file)
+        cached_key = _KEY_CACHE.get(key_path)
+        if cached_key is not None:
+            return cached_key
         
         if os.path.exists(key_file):
             with open(key_file, "rb") as f:
-                return f.read()
+                key = f.read()
+            _KEY_CACHE[key_path] = key
+            return key
         
         # Generate new key
         password = b"portfolio_app_key"  # In production, use a proper password
@@ -42,11 +80,14 @@ class DatabaseManager:
         with open("salt.key", "wb") as f:
             f.write(salt)
             
+        _KEY_CACHE[key_path] = key
         return key
     
     def _init_database(self):
         """Initialize database tables"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._lock, self._conn as conn:
+            # WAL is stored in the database file, so this only needs to run once per DB
+            conn.execute("PRAGMA journal_mode=WAL")
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS credentials (
                     broker TEXT PRIMARY KEY,
@@ -100,6 +141,13 @@ class DatabaseManager:
                     FOREIGN KEY(date) REFERENCES portfolio_snapshots(date)
                 )
             """)
+
+            # The (date, symbol) primary key serves per-date reads; per-symbol history needs
+            # the inverse order. portfolio_snapshots.date is already its primary key.
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_holdings_symbol_date
+                ON holdings_snapshots(symbol, date)
+            """)
             
             conn.commit()
     
@@ -110,8 +158,31 @@ class DatabaseManager:
         # Format date as YYYY-mm-dd
         snapshot_date = portfolio.last_updated.strftime('%Y-%m-%d')
         
-        with sqlite3.connect(self.db_path) as conn:
+        # Build the holding rows before taking the write lock, so the transaction only runs SQL
+        holdings_data = [
+            (
+                snapshot_date,
+                h.symbol,
+                h.description,
+                h.quantity,
+                h.price,
+                h.unit_cost,
+                h.cost_basis,
+                h.current_value,
+                h.day_change_percent,
+                h.day_change_dollars,
+                h.unrealized_gain_loss,
+                h.unrealized_gain_loss_percent,
+                h.portfolio_percentage,
+                json.dumps(h.brokers)
+            )
+            for h in portfolio.holdings
+        ]
+        
+        with self._lock, self._conn as conn:
             cursor = conn.cursor()
+            # The summary, the delete and the holdings insert go out as one write transaction
+            cursor.execute("BEGIN IMMEDIATE")
             
             # Insert or replace portfolio snapshot
             cursor.execute("""
@@ -135,25 +206,6 @@ class DatabaseManager:
             cursor.execute("DELETE FROM holdings_snapshots WHERE date = ?", (snapshot_date,))
             
             # Insert holdings
-            holdings_data = []
-            for h in portfolio.holdings:
-                holdings_data.append((
-                    snapshot_date,
-                    h.symbol,
-                    h.description,
-                    h.quantity,
-                    h.price,
-                    h.unit_cost,
-                    h.cost_basis,
-                    h.current_value,
-                    h.day_change_percent,
-                    h.day_change_dollars,
-                    h.unrealized_gain_loss,
-                    h.unrealized_gain_loss_percent,
-                    h.portfolio_percentage,
-                    json.dumps(h.brokers)
-                ))
-            
             cursor.executemany("""
                 INSERT INTO holdings_snapshots (
                     date, symbol, description, quantity, price, unit_cost,
@@ -168,7 +220,7 @@ class DatabaseManager:
 
     def store_credentials(self, broker: str, username: str, password: str):
         """Store broker credentials"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._lock, self._conn as conn:
             conn.execute("""
                 INSERT OR REPLACE INTO credentials 
                 (broker, username, password, updated_at)
@@ -178,7 +230,7 @@ class DatabaseManager:
     
     def get_credentials(self, broker: str) -> Optional[Dict[str, Any]]:
         """Retrieve broker credentials"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._lock, self._conn as conn:
             cursor = conn.execute("""
                 SELECT username, password 
                 FROM credentials WHERE broker = ?
@@ -198,20 +250,20 @@ class DatabaseManager:
         """Store encrypted session data"""
         # Encrypt the session data
         session_json = json.dumps(session_data)
-        encrypted_data = self.cipher_suite.encrypt(session_json.encode())
-        encrypted_b64 = base64.b64encode(encrypted_data).decode()
+        # Fernet tokens are already URL-safe base64, so they are stored as-is
+        encrypted_token = self.cipher_suite.encrypt(session_json.encode()).decode("ascii")
         
-        with sqlite3.connect(self.db_path) as conn:
+        with self._lock, self._conn as conn:
             conn.execute("""
                 INSERT OR REPLACE INTO sessions 
                 (broker, session_data, expires_at, updated_at)
                 VALUES (?, ?, ?, CURRENT_TIMESTAMP)
-            """, (broker, encrypted_b64, expires_at))
+            """, (broker, encrypted_token, expires_at))
             conn.commit()
     
     def get_session(self, broker: str) -> Optional[Dict[str, Any]]:
         """Retrieve and decrypt session data"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._lock, self._conn as conn:
             cursor = conn.execute("""
                 SELECT session_data, expires_at 
                 FROM sessions WHERE broker = ?
@@ -219,11 +271,14 @@ class DatabaseManager:
             
             row = cursor.fetchone()
             if row:
-                encrypted_b64, expires_at = row
+                encrypted_token, expires_at = row
                 try:
                     # Decrypt the session data
-                    encrypted_data = base64.b64decode(encrypted_b64)
-                    decrypted_data = self.cipher_suite.decrypt(encrypted_data)
+                    token = encrypted_token.encode("ascii")
+                    if not token.startswith(_FERNET_TOKEN_PREFIX):
+                        # Sessions stored before tokens were saved as-is carry an extra base64 layer
+                        token = base64.b64decode(token)
+                    decrypted_data = self.cipher_suite.decrypt(token)
                     session_data = json.loads(decrypted_data.decode())
                     
                     return {
@@ -238,12 +293,37 @@ class DatabaseManager:
     
     def clear_session(self, broker: str):
         """Clear session data for a broker"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._lock, self._conn as conn:
             conn.execute("DELETE FROM sessions WHERE broker = ?", (broker,))
             conn.commit()
     
+    def delete_credentials(self, broker: str):
+        """Delete credentials and any stored session for a broker"""
+        # BEGIN IMMEDIATE takes the write lock up front so both deletes land in one transaction
+        with self._lock, self._conn as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("DELETE FROM credentials WHERE broker = ?", (broker,))
+            conn.execute("DELETE FROM sessions WHERE broker = ?", (broker,))
+    
     def list_brokers(self) -> list:
         """List all brokers with stored credentials"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._lock, self._conn as conn:
             cursor = conn.execute("SELECT broker FROM credentials")
             return [row[0] for row in cursor.fetchall()]
+
+    def list_all_credentials(self) -> List[Tuple[str, str, str]]:
+        """List (broker, username, password) for every broker in one query"""
+        with self._lock, self._conn as conn:
+            cursor = conn.execute("SELECT broker, username, password FROM credentials")
+            return cursor.fetchall()
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()